@@ -6,20 +6,50 @@ Author: GitHub Copilot
 License: MIT
 """
 
+import io
 import os
 import re
 import json
+import math
+import cProfile
+import pstats
+import queue
+import random
+import signal
+import sys
+import hashlib
 import logging
+import multiprocessing
 import sqlite3
+import html.parser
+import tempfile
+import threading
+import time
+import tracemalloc
 import requests
 import tweepy
 import praw
+from abc import ABC, abstractmethod
 from bs4 import BeautifulSoup
-from datetime import datetime
-from typing import List, Dict, Optional
+from contextlib import contextmanager
+from collections import defaultdict, deque
+from concurrent.futures import (FIRST_COMPLETED, Future, ThreadPoolExecutor, as_completed, wait,
+                                TimeoutError as FuturesTimeoutError)
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Callable, Iterable, Iterator, List, Dict, NamedTuple, Optional, Tuple
+from urllib.parse import urlparse
+from types import SimpleNamespace
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+try:
+    from lxml import etree
+except ImportError:  # lxml is optional; the stdlib parser is used instead
+    etree = None
 from dotenv import load_dotenv
-from apscheduler.schedulers.blocking import BlockingScheduler
-from apscheduler.triggers.interval import IntervalTrigger
 
 # Configure logging
 logging.basicConfig(
@@ -35,6 +65,10 @@ logger = logging.getLogger(__name__)
 # Load environment variables
 load_dotenv()
 
+# From Python 3.12 cProfile is built on sys.monitoring, which allows only one
+# active profiler per process, so concurrent per-thread profiles are impossible
+PROFILE_PER_THREAD = sys.version_info < (3, 12)
+
 # Configuration
 class Config:
     """Configuration class for storing API keys and settings."""
@@ -49,9 +83,35 @@ class Config:
     
     TELEGRAM_BOT_TOKEN = os.getenv('TELEGRAM_BOT_TOKEN')
     TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID')
+    TELEGRAM_API_BASE = os.getenv('TELEGRAM_API_BASE', 'https://api.telegram.org')
     
     DISCORD_WEBHOOK_URL = os.getenv('DISCORD_WEBHOOK_URL')
     
+    # Search Twitter with one OR query across all keywords instead of one per keyword
+    TWITTER_COMBINED_QUERY = True
+    
+    # Notification dispatch: codes found close together are sent as one message
+    NOTIFY_BATCH_SIZE = 10           # codes per message (Discord allows 10 embeds)
+    NOTIFY_COALESCE_SECONDS = 2      # how long to wait for more codes before sending
+    NOTIFY_TIMEOUT = 10              # seconds per HTTP request
+    NOTIFY_MAX_RETRIES = 4
+    NOTIFY_BACKOFF_BASE = 1          # seconds, doubled on every retry
+    TELEGRAM_MESSAGES_PER_SECOND = 1  # Telegram's per-chat limit
+    TELEGRAM_BURST = 1
+    DISCORD_MESSAGES_PER_SECOND = 2.5  # Discord webhooks allow 5 requests per 2s
+    DISCORD_BURST = 5
+    
+    # Code verification: with VALIDATOR_URL set (a URL template containing
+    # '{code}'), new codes are checked concurrently in the background and, if
+    # NOTIFY_ONLY_VALID, only valid or inconclusive ones are notified
+    VALIDATOR_URL = os.getenv('VALIDATOR_URL')
+    VALIDATOR_CONCURRENCY = 4
+    VALIDATOR_TIMEOUT = 10
+    VERDICT_TTL = 6 * 60 * 60        # seconds before a valid verdict is rechecked
+    VERIFY_RECHECK_LIMIT = 100       # stale codes rechecked per pass
+    VERIFY_RECHECK_INTERVAL = 10 * 60  # seconds between background recheck passes
+    NOTIFY_ONLY_VALID = True
+    
     SEARCH_KEYWORDS = [
         "Farcaster invite code",
         "Farcaster invite link",
@@ -61,96 +121,1463 @@ class Config:
     # Regex pattern for Farcaster invite codes (alphanumeric, 8-12 chars)
     INVITE_CODE_PATTERN = r'\b[A-Za-z0-9]{8,12}\b'
     
+    # Codes are only looked for within this many characters of an invite keyword
+    INVITE_KEYWORD_PATTERN = r'invit\w*|referr?al|\bcodes?\b|\bjoin\b|\bref\b'
+    CODE_CONTEXT_WINDOW = 200
+    
+    # Candidates scoring below this are treated as ordinary words and dropped
+    MIN_CODE_SCORE = 1
+    
     # Database settings
     DB_PATH = 'farcaster_codes.db'
     
+    # SQLite tuning applied to every connection. WAL lets reporting readers run
+    # while the scraper writes; NORMAL sync is durable across crashes in WAL mode.
+    DB_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'mmap_size': 256 * 1024 * 1024,
+        'cache_size': -64 * 1024,  # negative means KiB, i.e. 64 MiB
+        'busy_timeout': 5000,
+        'temp_store': 'MEMORY'
+    }
+    
     # Search interval in minutes
     SEARCH_INTERVAL = 10
+    
+    # Per-source search intervals in minutes; sources not listed use SEARCH_INTERVAL
+    SOURCE_INTERVALS = {
+        'Twitter': 10,
+        'Reddit': 5,
+        'Web': 30
+    }
+    # A source that finds nothing new waits BACKOFF_FACTOR times longer next time,
+    # up to MAX_BACKOFF times its interval; a run with new codes resets the interval
+    SCHEDULE_BACKOFF_FACTOR = 1.5
+    SCHEDULE_MAX_BACKOFF = 4
+    SCHEDULE_JITTER = 0.1  # +/- fraction of the interval, to spread API calls
+    
+    # Multi-process mode: WORKER_PROCESSES > 0 runs (source, keyword) jobs from a
+    # shared SQLite job queue in that many processes, every SEARCH_INTERVAL minutes,
+    # with the main process as the single writer for codes, source progress and
+    # notifications. Workers are spawned, so they read settings from the environment.
+    WORKER_PROCESSES = int(os.getenv('WORKER_PROCESSES', '0'))
+    QUEUE_PATH = 'farcaster_jobs.db'
+    WORKER_MAX_ATTEMPTS = 3
+    WORKER_JOB_TIMEOUT = 15 * 60  # seconds before a claimed job is assumed lost
+    
+    # Found codes are buffered and written in one transaction per batch
+    INGEST_BATCH_SIZE = 5000
+    
+    # In-memory dedup of codes already in the database: 'exact' keeps every code
+    # in a set, 'bloom' uses far less memory for very large histories but drops
+    # roughly BLOOM_ERROR_RATE of genuinely new codes as false positives
+    SEEN_CACHE_MODE = 'exact'
+    BLOOM_CAPACITY = 1_000_000
+    BLOOM_ERROR_RATE = 0.001
+    
+    # Maximum number of keywords searched at the same time per source
+    SOURCE_CONCURRENCY = {
+        'Twitter': 2,
+        'Reddit': 3,
+        'Web': 3
+    }
+    
+    # Web result crawling
+    WEB_HEADERS = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+    }
+    WEB_MAX_CONCURRENCY = 8          # pages fetched at once across all keywords
+    WEB_PER_HOST_CONCURRENCY = 2     # pages fetched at once from a single host
+    WEB_MAX_PAGE_BYTES = 2 * 1024 * 1024  # pages are truncated beyond this size
+    WEB_FETCH_TIMEOUT = 10           # seconds, connect and per-read
+    WEB_CRAWL_DEADLINE = 60          # seconds before a keyword's remaining pages are dropped
+    
+    # How crawled pages are turned into text: 'lxml' streams parser events without
+    # building a tree (falls back to 'html.parser' if lxml is missing),
+    # 'html.parser' does the same with the stdlib, 'bs4' builds a full BeautifulSoup tree
+    HTML_TEXT_BACKEND = 'lxml'
+    
+    # Conditional-request cache for crawled pages: unchanged pages are not re-parsed
+    FETCH_CACHE_PATH = 'fetch_cache.db'
+    FETCH_CACHE_MAX_ENTRIES = 50_000  # least recently fetched URLs are evicted beyond this
+    
+    # Metrics in Prometheus text format, rewritten after every run; set
+    # METRICS_PORT to also serve them over HTTP at /metrics
+    METRICS_PATH = 'farcaster_metrics.prom'
+    METRICS_PORT = int(os.getenv('METRICS_PORT', '0')) or None
+    
+    # Directory for one cProfile capture per source run (disabled when unset).
+    # On Python 3.12+ only one profiler can run per process, so a profiled run
+    # searches its keywords one at a time and overlapping sources go unprofiled.
+    PROFILE_DIR = os.getenv('PROFILE_DIR')
+    
+    # Offline record/replay: 'record' saves live source responses to FIXTURES_DIR,
+    # 'replay' serves them back instead of the network, and 'benchmark' replays
+    # them BENCHMARK_ITERATIONS times against fresh databases and reports throughput.
+    # Replays never send notifications or call the validator.
+    REPLAY_MODE = os.getenv('REPLAY_MODE')
+    FIXTURES_DIR = os.getenv('FIXTURES_DIR', 'fixtures')
+    BENCHMARK_ITERATIONS = int(os.getenv('BENCHMARK_ITERATIONS', '5'))
+
+class Metrics:
+    """Thread-safe counters, gauges and histograms rendered in Prometheus text format."""
+    
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+    
+    HELP = {
+        'scraper_fetch_seconds': ('histogram', 'Latency of source API calls and page fetches'),
+        'scraper_downloaded_bytes_total': ('counter', 'Response bytes downloaded'),
+        'scraper_code_candidates_total': ('counter', 'Regex matches considered as invite codes'),
+        'scraper_codes_accepted_total': ('counter', 'Regex matches that passed code scoring'),
+        'scraper_new_codes_total': ('counter', 'Codes inserted into the database for the first time'),
+        'scraper_db_insert_seconds': ('histogram', 'Latency of batched code inserts'),
+        'scraper_code_verdicts_total': ('counter', 'Validity checks by verdict'),
+        'scraper_notification_queue_depth': ('gauge', 'Codes waiting to be notified'),
+        'scraper_iteration_seconds': ('histogram', 'Duration of a full run of a source'),
+        'scraper_source_runs_total': ('counter', 'Scheduled runs completed per source'),
+        'scraper_source_last_run_seconds': ('gauge', 'Duration of the latest scheduled run'),
+        'scraper_source_avg_run_seconds': ('gauge', 'Mean duration of scheduled runs'),
+        'scraper_source_max_run_seconds': ('gauge', 'Longest scheduled run'),
+        'scraper_source_last_new_codes': ('gauge', 'New codes found by the latest scheduled run'),
+        'scraper_source_interval_seconds': ('gauge', 'Current adaptive interval between runs')
+    }
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters: Dict[Tuple, float] = {}
+        self.gauges: Dict[Tuple, Callable[[], float]] = {}
+        self.histograms: Dict[Tuple, Tuple[List[int], List[float]]] = {}
+    
+    def inc(self, name: str, value: float = 1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+    
+    def gauge(self, name: str, read: Callable[[], float], **labels):
+        """Register a gauge whose value is read whenever metrics are rendered."""
+        with self.lock:
+            self.gauges[(name, tuple(sorted(labels.items())))] = read
+    
+    def observe(self, name: str, value: float, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            buckets, totals = self.histograms.setdefault(key, ([0] * len(self.BUCKETS), [0, 0.0]))
+            for index, bound in enumerate(self.BUCKETS):
+                if value <= bound:
+                    buckets[index] += 1
+            totals[0] += 1
+            totals[1] += value
+    
+    @contextmanager
+    def timer(self, name: str, **labels):
+        """Observe how long the wrapped block takes, in seconds."""
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(name, time.monotonic() - started, **labels)
+    
+    @staticmethod
+    def _labels(labels: Tuple, *extra: str) -> str:
+        parts = [f'{key}="{value}"' for key, value in labels] + list(extra)
+        return '{' + ','.join(parts) + '}' if parts else ''
+    
+    def render(self) -> str:
+        """Return every metric in the Prometheus text exposition format."""
+        with self.lock:
+            values = dict(self.counters)
+            values.update((key, read()) for key, read in self.gauges.items())
+            histograms = {key: (list(buckets), list(totals))
+                          for key, (buckets, totals) in self.histograms.items()}
+        
+        lines = []
+        for name, (kind, text) in self.HELP.items():
+            lines.append(f'# HELP {name} {text}')
+            lines.append(f'# TYPE {name} {kind}')
+            for (metric, labels), value in sorted(values.items()):
+                if metric == name:
+                    lines.append(f'{name}{self._labels(labels)} {value}')
+            for (metric, labels), (buckets, (count, total)) in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                for bound, observed in zip(self.BUCKETS, buckets):
+                    lines.append(f'{name}_bucket{self._labels(labels, "le=" + json.dumps(str(bound)))} {observed}')
+                lines.append(f'{name}_bucket{self._labels(labels, "le=" + json.dumps("+Inf"))} {count}')
+                lines.append(f'{name}_sum{self._labels(labels)} {total}')
+                lines.append(f'{name}_count{self._labels(labels)} {count}')
+        return '\n'.join(lines) + '\n'
+    
+    def write(self, path: str):
+        """Atomically write the rendered metrics to a file (for node_exporter's textfile collector)."""
+        temp_path = f'{path}.tmp'
+        with open(temp_path, 'w') as f:
+            f.write(self.render())
+        os.replace(temp_path, path)
+    
+    def serve(self, port: int) -> ThreadingHTTPServer:
+        """Serve the rendered metrics at /metrics from a background thread."""
+        registry = self
+        
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = registry.render().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, format, *args):
+                logger.debug(f"Metrics request: {format % args}")
+        
+        server = ThreadingHTTPServer(('', port), MetricsHandler)
+        threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+        logger.info(f"Serving metrics on port {server.server_address[1]}")
+        return server
+
+metrics = Metrics()
 
 class Database:
     """SQLite database manager for storing found invite codes."""
     
+    # Schema migrations, applied in order. The database's PRAGMA user_version
+    # records how many have run, so existing files upgrade in place.
+    MIGRATIONS = [
+        # 1: initial schema
+        '''
+        CREATE TABLE IF NOT EXISTS invite_codes (
+            code TEXT PRIMARY KEY,
+            source TEXT,
+            found_at TIMESTAMP,
+            url TEXT,
+            is_valid BOOLEAN DEFAULT NULL
+        );
+        ''',
+        # 2: indexes for time-window and per-source reporting queries
+        '''
+        CREATE INDEX IF NOT EXISTS idx_invite_codes_found_at ON invite_codes (found_at);
+        CREATE INDEX IF NOT EXISTS idx_invite_codes_source ON invite_codes (source, found_at);
+        ''',
+        # 3: per-submission high-water marks for incremental Reddit scans
+        '''
+        CREATE TABLE IF NOT EXISTS reddit_submissions (
+            submission_id TEXT PRIMARY KEY,
+            num_comments INTEGER,
+            last_comment_utc REAL,
+            scanned_at TIMESTAMP
+        );
+        ''',
+        # 4: per-query since_id cursors for incremental Twitter searches
+        '''
+        CREATE TABLE IF NOT EXISTS twitter_cursors (
+            query TEXT PRIMARY KEY,
+            since_id INTEGER,
+            updated_at TIMESTAMP
+        );
+        ''',
+        # 5: when each code's validity was last checked
+        '''
+        ALTER TABLE invite_codes ADD COLUMN checked_at TIMESTAMP;
+        CREATE INDEX IF NOT EXISTS idx_invite_codes_checked_at ON invite_codes (checked_at);
+        '''
+    ]
+    
+    # Most bound parameters one statement may use on SQLite older than 3.32
+    MAX_SQL_VARIABLES = 999
+    
+    # Source progress written by add_codes, by kind; values are followed by the write time
+    PROGRESS_UPSERTS = {
+        'reddit': '''
+            INSERT OR REPLACE INTO reddit_submissions
+                (submission_id, num_comments, last_comment_utc, scanned_at)
+            VALUES (?, ?, ?, ?)
+        ''',
+        'twitter': '''
+            INSERT OR REPLACE INTO twitter_cursors (query, since_id, updated_at)
+            VALUES (?, ?, ?)
+        '''
+    }
+    
     def __init__(self):
-        self.conn = sqlite3.connect(Config.DB_PATH)
+        # Searches run on worker threads, so the connection is shared behind a lock
+        self.conn = sqlite3.connect(Config.DB_PATH, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.configure_connection(self.conn)
         self.create_tables()
     
+    @staticmethod
+    def configure_connection(conn: sqlite3.Connection, read_only: bool = False):
+        """Apply Config.DB_PRAGMAS to a connection."""
+        for name, value in Config.DB_PRAGMAS.items():
+            if read_only and name in ('journal_mode', 'synchronous'):
+                continue
+            conn.execute(f'PRAGMA {name} = {value}')
+        if read_only:
+            conn.execute('PRAGMA query_only = ON')
+    
+    @staticmethod
+    def open_reader() -> sqlite3.Connection:
+        """Open a read-only connection for reporting.
+        
+        In WAL mode readers see a consistent snapshot and never block, or get
+        blocked by, the scraper's writes.
+        """
+        conn = sqlite3.connect(f'file:{Config.DB_PATH}?mode=ro', uri=True)
+        Database.configure_connection(conn, read_only=True)
+        return conn
+    
+    def schema_version(self) -> int:
+        """Return the number of migrations applied to the database."""
+        return self.conn.execute('PRAGMA user_version').fetchone()[0]
+    
     def create_tables(self):
-        """Create necessary database tables if they don't exist."""
-        with self.conn:
-            self.conn.execute('''
-                CREATE TABLE IF NOT EXISTS invite_codes (
-                    code TEXT PRIMARY KEY,
-                    source TEXT,
-                    found_at TIMESTAMP,
-                    url TEXT,
-                    is_valid BOOLEAN DEFAULT NULL
-                )
+        """Create or upgrade the database schema by running pending migrations."""
+        version = self.schema_version()
+        for number, migration in enumerate(self.MIGRATIONS[version:], start=version + 1):
+            logger.info(f"Applying database migration {number}")
+            self.conn.executescript(f'''
+                BEGIN;
+                {migration}
+                PRAGMA user_version = {number};
+                COMMIT;
             ''')
+        # Per-connection staging table for batched inserts
+        self.conn.execute('''
+            CREATE TEMP TABLE IF NOT EXISTS pending_codes (
+                code TEXT PRIMARY KEY,
+                source TEXT,
+                url TEXT
+            )
+        ''')
     
-    def add_code(self, code: str, source: str, url: str):
-        """Add a new invite code to the database if it doesn't exist."""
+    def add_codes(self, candidates: Iterable[Tuple[str, str, str]],
+                  progress: Iterable[Tuple[str, tuple]] = ()) -> Optional[List[Tuple[str, str, str]]]:
+        """Add a batch of (code, source, url) candidates in a single transaction.
+        
+        Duplicates inside the batch keep their first occurrence. `progress` holds
+        (kind, values) source state from PROGRESS_UPSERTS, such as how far a Reddit
+        submission was scanned; it is written in the same transaction, so it can
+        never get ahead of the codes found before it.
+        
+        Returns the candidates that were not already stored, i.e. the ones worth
+        notifying about, or None if the transaction failed and nothing was written.
+        """
+        unique = {}
+        for code, source, url in candidates:
+            unique.setdefault(code, (code, source, url))
+        progress = list(progress)
+        if not unique and not progress:
+            return []
+        
+        new_codes = set()
         try:
-            with self.conn:
-                self.conn.execute('''
-                    INSERT OR IGNORE INTO invite_codes (code, source, found_at, url)
-                    VALUES (?, ?, ?, ?)
-                ''', (code, source, datetime.now(), url))
-            return True
+            with metrics.timer('scraper_db_insert_seconds'), self.lock, self.conn:
+                if unique:
+                    new_codes = self._insert_codes(unique.values())
+                now = datetime.now()
+                for kind, values in progress:
+                    self.conn.execute(self.PROGRESS_UPSERTS[kind], (*values, now))
+            return [candidate for code, candidate in unique.items() if code in new_codes]
         except sqlite3.Error as e:
             logger.error(f"Database error: {e}")
-            return False
+            return None
+    
+    def _insert_codes(self, candidates: Iterable[Tuple[str, str, str]]) -> set:
+        """Insert candidates inside the caller's transaction and return the codes that were new."""
+        self.conn.execute('DELETE FROM pending_codes')
+        self.conn.executemany('INSERT INTO pending_codes (code, source, url) VALUES (?, ?, ?)',
+                              candidates)
+        if sqlite3.sqlite_version_info >= (3, 35, 0):
+            cursor = self.conn.execute('''
+                INSERT OR IGNORE INTO invite_codes (code, source, found_at, url)
+                SELECT code, source, ?, url FROM pending_codes
+                RETURNING code
+            ''', (datetime.now(),))
+            new_codes = {row[0] for row in cursor.fetchall()}
+        else:
+            # No RETURNING support: work out what is new before inserting
+            cursor = self.conn.execute('''
+                SELECT code FROM pending_codes
+                WHERE code NOT IN (SELECT code FROM invite_codes)
+            ''')
+            new_codes = {row[0] for row in cursor.fetchall()}
+            self.conn.execute('''
+                INSERT OR IGNORE INTO invite_codes (code, source, found_at, url)
+                SELECT code, source, ?, url FROM pending_codes
+            ''', (datetime.now(),))
+        self.conn.execute('DELETE FROM pending_codes')
+        return new_codes
+    
+    def count_codes(self) -> int:
+        """Return the number of stored invite codes."""
+        with self.lock:
+            return self.conn.execute('SELECT COUNT(*) FROM invite_codes').fetchone()[0]
     
-    def is_code_exists(self, code: str) -> bool:
-        """Check if a code already exists in the database."""
+    def iter_codes(self) -> Iterator[str]:
+        """Yield every stored invite code."""
         cursor = self.conn.cursor()
-        cursor.execute('SELECT 1 FROM invite_codes WHERE code = ?', (code,))
-        return cursor.fetchone() is not None
+        with self.lock:
+            cursor.execute('SELECT code FROM invite_codes')
+        while True:
+            with self.lock:
+                rows = cursor.fetchmany(10000)
+            if not rows:
+                break
+            for (code,) in rows:
+                yield code
+    
+    def get_reddit_state(self, submission_id: str) -> Optional[Tuple[int, float]]:
+        """Return (num_comments, last_comment_utc) from the last scan of a submission."""
+        with self.lock:
+            return self.conn.execute('''
+                SELECT num_comments, last_comment_utc FROM reddit_submissions
+                WHERE submission_id = ?
+            ''', (submission_id,)).fetchone()
+    
+    def get_twitter_cursor(self, query: str) -> Optional[int]:
+        """Return the newest tweet ID already processed for a search query."""
+        with self.lock:
+            row = self.conn.execute('SELECT since_id FROM twitter_cursors WHERE query = ?',
+                                    (query,)).fetchone()
+        return row[0] if row else None
+    
+    def get_verdicts(self, codes: List[str]) -> Dict[str, Tuple[Optional[int], Optional[datetime]]]:
+        """Return (is_valid, checked_at) for each stored code.
+        
+        Codes are looked up MAX_SQL_VARIABLES at a time, so batches of any size
+        work on SQLite builds with the old 999-parameter limit.
+        """
+        rows = []
+        with self.lock:
+            for start in range(0, len(codes), self.MAX_SQL_VARIABLES):
+                chunk = codes[start:start + self.MAX_SQL_VARIABLES]
+                rows.extend(self.conn.execute(f'''
+                    SELECT code, is_valid, checked_at FROM invite_codes
+                    WHERE code IN ({','.join('?' * len(chunk))})
+                ''', chunk).fetchall())
+        return {code: (is_valid, datetime.fromisoformat(checked_at) if checked_at else None)
+                for code, is_valid, checked_at in rows}
+    
+    def set_verdicts(self, verdicts: Dict[str, Optional[bool]]):
+        """Store validity verdicts; inconclusive ones only update checked_at."""
+        try:
+            with self.lock, self.conn:
+                self.conn.executemany('''
+                    UPDATE invite_codes SET is_valid = COALESCE(?, is_valid), checked_at = ?
+                    WHERE code = ?
+                ''', [(verdict, datetime.now(), code) for code, verdict in verdicts.items()])
+        except sqlite3.Error as e:
+            logger.error(f"Database error: {e}")
+    
+    def codes_to_verify(self, checked_before: datetime, limit: int) -> List[str]:
+        """Return codes not known to be invalid whose verdict is missing or older than a cutoff."""
+        with self.lock:
+            rows = self.conn.execute('''
+                SELECT code FROM invite_codes
+                WHERE (is_valid IS NULL OR is_valid = 1)
+                  AND (checked_at IS NULL OR checked_at < ?)
+                ORDER BY found_at DESC LIMIT ?
+            ''', (checked_before, limit)).fetchall()
+        return [code for (code,) in rows]
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings using double hashing."""
+    
+    def __init__(self, capacity: int, error_rate: float):
+        capacity = max(1, capacity)
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+    
+    def _positions(self, item: str) -> Iterator[int]:
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return ((first + i * second) % self.size for i in range(self.hash_count))
+    
+    def add(self, item: str):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+    
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7))
+                   for position in self._positions(item))
+
+class SeenCodeCache:
+    """In-process record of stored codes, consulted before touching SQLite.
+    
+    A hit means the code is (probably, in bloom mode) already in the database
+    and can be dropped; only misses are queued for the batched insert.
+    """
+    
+    def __init__(self, mode: str = 'exact', capacity: int = 0):
+        self.mode = mode
+        if mode == 'bloom':
+            self.codes = BloomFilter(max(Config.BLOOM_CAPACITY, capacity * 2), Config.BLOOM_ERROR_RATE)
+        else:
+            self.codes = set()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    @classmethod
+    def from_database(cls, db: Database) -> 'SeenCodeCache':
+        """Build a cache warmed with every code already in the database."""
+        count = db.count_codes()
+        cache = cls(Config.SEEN_CACHE_MODE, count)
+        for code in db.iter_codes():
+            cache.codes.add(code)
+        logger.info(f"Loaded {count} known codes into {cache.mode} seen-code cache")
+        return cache
+    
+    def seen(self, code: str) -> bool:
+        """Return True if the code is already known, counting hits and misses."""
+        with self.lock:
+            if code in self.codes:
+                self.hits += 1
+                return True
+            self.misses += 1
+            return False
+    
+    def add(self, code: str):
+        with self.lock:
+            self.codes.add(code)
+    
+    def stats(self) -> Dict[str, int]:
+        with self.lock:
+            return {'hits': self.hits, 'misses': self.misses}
+
+class TokenBucket:
+    """Thread-safe token bucket used to stay under an API's rate limit."""
+    
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+    
+    def acquire(self):
+        """Block until a token is available and take it."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if now >= self.blocked_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = max(self.blocked_until - now, (1 - self.tokens) / self.rate)
+            time.sleep(wait)
+    
+    def pause(self, seconds: float):
+        """Hold every caller back for a while, e.g. after a 429 response."""
+        with self.lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+            self.tokens = 0
 
 class NotificationService:
-    """Service for sending notifications about new invite codes."""
+    """Background dispatcher for notifications about new invite codes.
+    
+    notify() only puts the code on a queue. A worker thread coalesces queued
+    codes into batched Telegram/Discord messages, paces them with a token
+    bucket per service and retries failures with exponential backoff, so slow
+    or rate-limited webhooks never hold up scraping.
+    """
+    
+    def __init__(self):
+        self.queue: queue.Queue = queue.Queue()
+        self.session = requests.Session()
+        self.telegram_bucket = TokenBucket(Config.TELEGRAM_MESSAGES_PER_SECOND, Config.TELEGRAM_BURST)
+        self.discord_bucket = TokenBucket(Config.DISCORD_MESSAGES_PER_SECOND, Config.DISCORD_BURST)
+        self.worker = threading.Thread(target=self._run, name="notifier", daemon=True)
+        self.worker.start()
+        metrics.gauge('scraper_notification_queue_depth', self.queue.qsize)
+    
+    def notify(self, code: str, source: str, url: str):
+        """Queue a new code for notification without blocking."""
+        self.queue.put((code, source, url))
+    
+    def close(self, timeout: Optional[float] = None):
+        """Send everything still queued, then stop the worker."""
+        self.queue.put(None)
+        self.worker.join(timeout)
+        self.session.close()
+    
+    def _run(self):
+        """Worker loop: gather a batch, send it, repeat until closed."""
+        stopping = False
+        while not stopping:
+            item = self.queue.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = time.monotonic() + Config.NOTIFY_COALESCE_SECONDS
+            while len(batch) < Config.NOTIFY_BATCH_SIZE:
+                try:
+                    item = self.queue.get(timeout=max(0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            # A failure in one service must neither stop the worker nor skip the other
+            for service, send in (("Telegram", self.send_telegram_batch), ("Discord", self.send_discord_batch)):
+                try:
+                    send(batch)
+                except Exception as e:
+                    logger.error(f"{service} notification of {len(batch)} codes failed: {e}")
     
     @staticmethod
-    def send_telegram_notification(code: str, source: str, url: str):
-        """Send notification via Telegram."""
+    def _retry_after(response: requests.Response, default: float) -> float:
+        """Seconds to wait after a 429, from the JSON body or the Retry-After header.
+        
+        Telegram nests retry_after under 'parameters', Discord puts it at the top
+        level, and Retry-After may be seconds or an HTTP date. Hints that cannot be
+        read fall through to the next one and finally to the default backoff.
+        """
+        try:
+            body = response.json()
+        except ValueError:
+            body = None
+        hints = []
+        if isinstance(body, dict):
+            parameters = body.get('parameters')
+            if isinstance(parameters, dict):
+                hints.append(parameters.get('retry_after'))
+            hints.append(body.get('retry_after'))
+        hints.append(response.headers.get('Retry-After'))
+        
+        for hint in hints:
+            if hint is None:
+                continue
+            try:
+                seconds = float(hint)
+            except (TypeError, ValueError):
+                try:
+                    seconds = (parsedate_to_datetime(hint) - datetime.now(timezone.utc)).total_seconds()
+                except (TypeError, ValueError):
+                    continue
+            if math.isfinite(seconds):
+                return max(0.0, seconds)
+        return default
+    
+    def _post(self, service: str, url: str, payload: Dict, bucket: TokenBucket) -> bool:
+        """POST with rate limiting, honouring 429 retry hints and backing off on errors."""
+        for attempt in range(Config.NOTIFY_MAX_RETRIES + 1):
+            bucket.acquire()
+            delay = Config.NOTIFY_BACKOFF_BASE * 2 ** attempt * (1 + random.random() / 2)
+            try:
+                response = self.session.post(url, json=payload, timeout=Config.NOTIFY_TIMEOUT)
+            except requests.RequestException as e:
+                logger.warning(f"{service} notification error (attempt {attempt + 1}): {e}")
+                time.sleep(delay)
+                continue
+            
+            if response.ok:
+                return True
+            if response.status_code == 429:
+                retry_after = self._retry_after(response, delay)
+                logger.warning(f"{service} rate limited, retrying in {retry_after:.1f}s")
+                bucket.pause(retry_after)
+            elif response.status_code >= 500:
+                logger.warning(f"{service} notification failed with {response.status_code}, retrying")
+                time.sleep(delay)
+            else:
+                logger.error(f"{service} notification rejected: {response.status_code} {response.text[:200]}")
+                return False
+        logger.error(f"{service} notification dropped after {Config.NOTIFY_MAX_RETRIES + 1} attempts")
+        return False
+    
+    def send_telegram_batch(self, batch: List[Tuple[str, str, str]]):
+        """Send a batch of codes as a single Telegram message."""
         if not (Config.TELEGRAM_BOT_TOKEN and Config.TELEGRAM_CHAT_ID):
             return
         
-        message = f"🎉 New Farcaster invite code found!\nCode: {code}\nSource: {source}\nURL: {url}"
-        telegram_url = f"https://api.telegram.org/bot{Config.TELEGRAM_BOT_TOKEN}/sendMessage"
-        
-        try:
-            requests.post(telegram_url, json={
-                'chat_id': Config.TELEGRAM_CHAT_ID,
-                'text': message
-            })
-        except Exception as e:
-            logger.error(f"Telegram notification error: {e}")
+        lines = [f"Code: {code}\nSource: {source}\nURL: {url}" for code, source, url in batch]
+        title = "🎉 New Farcaster invite code found!" if len(batch) == 1 else \
+            f"🎉 {len(batch)} new Farcaster invite codes found!"
+        message = title + "\n\n" + "\n\n".join(lines)
+        telegram_url = f"{Config.TELEGRAM_API_BASE}/bot{Config.TELEGRAM_BOT_TOKEN}/sendMessage"
+        self._post("Telegram", telegram_url, {
+            'chat_id': Config.TELEGRAM_CHAT_ID,
+            'text': message[:4096]
+        }, self.telegram_bucket)
     
-    @staticmethod
-    def send_discord_notification(code: str, source: str, url: str):
-        """Send notification via Discord webhook."""
+    def send_discord_batch(self, batch: List[Tuple[str, str, str]]):
+        """Send a batch of codes as one Discord webhook message with an embed per code."""
         if not Config.DISCORD_WEBHOOK_URL:
             return
-            
+        
         message = {
             "embeds": [{
                 "title": "New Farcaster Invite Code Found! 🎉",
                 "description": f"Code: `{code}`\nSource: {source}\nURL: {url}",
                 "color": 5814783
-            }]
+            } for code, source, url in batch[:10]]
         }
+        self._post("Discord", Config.DISCORD_WEBHOOK_URL, message, self.discord_bucket)
+
+class CodeValidator(ABC):
+    """Decides whether an invite code is real. Subclass and implement check()."""
+    
+    @abstractmethod
+    def check(self, code: str) -> Optional[bool]:
+        """Return True/False for a valid/invalid code, or None if it cannot be told."""
+
+class HttpCodeValidator(CodeValidator):
+    """Validates codes against an HTTP endpoint built from a '{code}' URL template.
+    
+    A 200 response means valid unless its JSON body says {"valid": false};
+    404 and 410 mean invalid; anything else is inconclusive.
+    """
+    
+    def __init__(self, url_template: str):
+        self.url_template = url_template
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_maxsize=Config.VALIDATOR_CONCURRENCY)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+    
+    def check(self, code: str) -> Optional[bool]:
+        try:
+            response = self.session.get(self.url_template.format(code=code), timeout=Config.VALIDATOR_TIMEOUT)
+        except requests.RequestException as e:
+            logger.debug(f"Validator error for {code}: {e}")
+            return None
+        if response.status_code in (404, 410):
+            return False
+        if response.status_code != 200:
+            return None
+        try:
+            return bool(response.json().get('valid', True))
+        except (ValueError, AttributeError):
+            return True
+
+class VerificationStage:
+    """Checks codes in the background and stores verdicts in invite_codes.is_valid.
+    
+    New codes are handed over with submit() and notified from here once
+    checked, and stale verdicts are rechecked on a timer thread, so scraping
+    never waits on the validator. Verdicts are cached in the database: codes
+    marked invalid are never checked again, and valid or inconclusive ones are
+    only rechecked once VERDICT_TTL has passed.
+    """
+    
+    def __init__(self, db: Database, validator: CodeValidator):
+        self.db = db
+        self.validator = validator
+        self.pool = ThreadPoolExecutor(max_workers=Config.VALIDATOR_CONCURRENCY, thread_name_prefix="verify")
+        # Batches are verified one at a time, in the order they were committed
+        self.dispatcher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="verify-dispatch")
+        self.stop_event = threading.Event()
+        self.rechecker: Optional[threading.Thread] = None
+    
+    def verify(self, codes: List[str]) -> Dict[str, Optional[bool]]:
+        """Return a verdict per code, checking only those without a fresh cached one."""
+        verdicts = {}
+        to_check = []
+        fresh_after = datetime.now() - timedelta(seconds=Config.VERDICT_TTL)
+        for code, (is_valid, checked_at) in self.db.get_verdicts(codes).items():
+            if is_valid == 0 or (checked_at is not None and checked_at > fresh_after):
+                verdicts[code] = None if is_valid is None else bool(is_valid)
+            else:
+                to_check.append(code)
+        
+        checked = dict(zip(to_check, self.pool.map(self.validator.check, to_check)))
+        self.db.set_verdicts(checked)
+        verdicts.update(checked)
+        for verdict in (True, False, None):
+            metrics.inc('scraper_code_verdicts_total', list(checked.values()).count(verdict), verdict=str(verdict))
+        return verdicts
+    
+    def submit(self, candidates: List[Tuple[str, str, str]], notify: Callable[[str, str, str], None]):
+        """Verify newly stored (code, source, url) candidates in the background, then notify.
+        
+        With NOTIFY_ONLY_VALID, codes found invalid are not notified.
+        """
+        self.dispatcher.submit(self._verify_and_notify, candidates, notify)
+    
+    def _verify_and_notify(self, candidates: List[Tuple[str, str, str]], notify: Callable[[str, str, str], None]):
+        try:
+            verdicts = self.verify([code for code, _, _ in candidates])
+        except Exception as e:
+            logger.error(f"Verification of {len(candidates)} codes failed: {e}")
+            verdicts = {}
+        for code, source, url in candidates:
+            if Config.NOTIFY_ONLY_VALID and verdicts.get(code) is False:
+                logger.info(f"Not notifying about invalid code {code}")
+                continue
+            notify(code, source, url)
+    
+    def recheck_stale(self):
+        """Re-verify a bounded number of stored codes whose verdict is missing or expired."""
+        before = datetime.now() - timedelta(seconds=Config.VERDICT_TTL)
+        codes = self.db.codes_to_verify(before, Config.VERIFY_RECHECK_LIMIT)
+        if codes:
+            verdicts = self.verify(codes)
+            logger.info(f"Rechecked {len(codes)} codes: {list(verdicts.values()).count(True)} valid")
+    
+    def start_rechecks(self):
+        """Run recheck_stale every VERIFY_RECHECK_INTERVAL seconds on a background thread."""
+        def run():
+            while not self.stop_event.wait(Config.VERIFY_RECHECK_INTERVAL):
+                try:
+                    self.recheck_stale()
+                except Exception as e:
+                    logger.error(f"Verdict recheck failed: {e}")
+        self.rechecker = threading.Thread(target=run, name="verify-recheck", daemon=True)
+        self.rechecker.start()
+    
+    def close(self):
+        """Stop rechecking and finish verifying (and notifying) what was submitted."""
+        self.stop_event.set()
+        if self.rechecker:
+            self.rechecker.join()
+        self.dispatcher.shutdown(wait=True)
+        self.pool.shutdown(wait=True)
+
+class FetchCache:
+    """Persistent per-URL validators and content hashes for crawled pages.
+    
+    Lets the crawler send conditional requests and recognise pages whose body
+    is byte-for-byte unchanged, so neither case is parsed or scanned again.
+    """
+    
+    def __init__(self, path: str = None):
+        self.conn = sqlite3.connect(path or Config.FETCH_CACHE_PATH, check_same_thread=False)
+        Database.configure_connection(self.conn)
+        self.lock = threading.Lock()
+        with self.conn:
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS fetch_cache (
+                    url TEXT PRIMARY KEY,
+                    etag TEXT,
+                    last_modified TEXT,
+                    content_hash TEXT,
+                    size INTEGER,
+                    last_access REAL
+                )
+            ''')
+            self.conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_fetch_cache_last_access ON fetch_cache (last_access)
+            ''')
+        self.stats = {'requests': 0, 'not_modified': 0, 'unchanged': 0, 'changed': 0, 'bytes_saved': 0}
+    
+    def get(self, url: str) -> Optional[Tuple[str, str, str, int]]:
+        """Return (etag, last_modified, content_hash, size) from the last fetch of a URL."""
+        with self.lock:
+            self.stats['requests'] += 1
+            return self.conn.execute('''
+                SELECT etag, last_modified, content_hash, size FROM fetch_cache WHERE url = ?
+            ''', (url,)).fetchone()
+    
+    def conditional_headers(self, entry: Optional[Tuple[str, str, str, int]]) -> Dict[str, str]:
+        """Build If-None-Match / If-Modified-Since headers from a cache entry."""
+        headers = {}
+        if entry is not None:
+            if entry[0]:
+                headers['If-None-Match'] = entry[0]
+            if entry[1]:
+                headers['If-Modified-Since'] = entry[1]
+        return headers
+    
+    def record(self, url: str, outcome: str, size: int):
+        """Count a not_modified/unchanged/changed outcome for the hit-rate stats."""
+        with self.lock:
+            self.stats[outcome] += 1
+            if outcome != 'changed':
+                self.stats['bytes_saved'] += size
+    
+    def put(self, url: str, etag: Optional[str], last_modified: Optional[str],
+            content_hash: Optional[str], size: int):
+        """Store or refresh a URL's validators and body hash."""
+        try:
+            with self.lock, self.conn:
+                self.conn.execute('''
+                    INSERT OR REPLACE INTO fetch_cache
+                        (url, etag, last_modified, content_hash, size, last_access)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', (url, etag, last_modified, content_hash, size, time.time()))
+        except sqlite3.Error as e:
+            logger.error(f"Fetch cache error: {e}")
+    
+    def evict(self):
+        """Drop the least recently fetched URLs beyond FETCH_CACHE_MAX_ENTRIES."""
+        try:
+            with self.lock, self.conn:
+                cursor = self.conn.execute('''
+                    DELETE FROM fetch_cache WHERE url IN (
+                        SELECT url FROM fetch_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?
+                    )
+                ''', (Config.FETCH_CACHE_MAX_ENTRIES,))
+            if cursor.rowcount:
+                logger.debug(f"Evicted {cursor.rowcount} fetch cache entries")
+        except sqlite3.Error as e:
+            logger.error(f"Fetch cache error: {e}")
+    
+    def hit_rate(self) -> float:
+        """Fraction of cached-URL lookups that avoided parsing the page."""
+        with self.lock:
+            skipped = self.stats['not_modified'] + self.stats['unchanged']
+            total = skipped + self.stats['changed']
+            return skipped / total if total else 0.0
+    
+    def close(self):
+        self.conn.close()
+
+class PageCrawler:
+    """Pooled, bounded fetcher for web search result pages.
+    
+    Pages are downloaded on a shared thread pool over one keep-alive session,
+    capped globally and per host, and handed back as they arrive so callers
+    can scan them while slower hosts are still downloading.
+    """
+    
+    def __init__(self):
+        self.session = requests.Session()
+        self.session.headers.update(Config.WEB_HEADERS)
+        adapter = HTTPAdapter(pool_connections=Config.WEB_MAX_CONCURRENCY,
+                              pool_maxsize=Config.WEB_MAX_CONCURRENCY)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.pool = ThreadPoolExecutor(max_workers=Config.WEB_MAX_CONCURRENCY,
+                                       thread_name_prefix="crawl")
+        # Fetches in flight per host, shared by every crawl running on the pool
+        self.host_active: Dict[str, int] = defaultdict(int)
+        self.host_slots = threading.Condition()
+        self.stop_event = threading.Event()
+        self.cache = FetchCache()
+    
+    def _release_host(self, host: str):
+        """Free a host slot once a fetch finishes or is cancelled."""
+        with self.host_slots:
+            self.host_active[host] -= 1
+            self.host_slots.notify_all()
+    
+    def _submit_ready(self, queues: Dict[str, deque], futures: Dict[Future, str], deadline: float):
+        """Submit queued URLs whose host is below WEB_PER_HOST_CONCURRENCY.
         
+        Host limits are checked here, before a pool slot is taken, so a host
+        with many results never parks pool threads waiting on its own limit.
+        """
+        with self.host_slots:
+            for host, pending in queues.items():
+                while pending and self.host_active[host] < Config.WEB_PER_HOST_CONCURRENCY:
+                    url = pending.popleft()
+                    self.host_active[host] += 1
+                    future = self.pool.submit(self.fetch, url, deadline)
+                    futures[future] = url
+                    future.add_done_callback(lambda _, host=host: self._release_host(host))
+    
+    def fetch(self, url: str, deadline: float) -> Optional[Tuple[str, Tuple]]:
+        """Download a single page, giving up on errors, oversize bodies or cancellation.
+        
+        Returns the page with its (etag, last_modified, content_hash, size) cache
+        entry, which is not stored yet: the caller records it with FetchCache.put
+        once the page's codes are saved, so a lost batch is re-parsed next time.
+        Returns None as well when the page is unchanged since the last fetch,
+        either because the server answered 304 or because the body hashes the same.
+        """
+        if self.stop_event.is_set() or time.monotonic() > deadline:
+            return None
+        entry = self.cache.get(url)
+        # Recording needs full responses, so validators are only sent otherwise
+        headers = self.cache.conditional_headers(entry) if Config.REPLAY_MODE != 'record' else {}
         try:
-            requests.post(Config.DISCORD_WEBHOOK_URL, json=message)
+            with metrics.timer('scraper_fetch_seconds', source='Web'), \
+                    self.session.get(url, timeout=Config.WEB_FETCH_TIMEOUT, stream=True,
+                                     headers=headers) as response:
+                if response.status_code == 304 and entry is not None:
+                    self.cache.record(url, 'not_modified', entry[3])
+                    self.cache.put(url, *entry)
+                    return None
+                if response.status_code != 200:
+                    return None
+                content_type = response.headers.get('Content-Type', 'text/html')
+                if not content_type.startswith(('text/', 'application/xhtml')):
+                    return None
+                
+                body = bytearray()
+                for chunk in response.iter_content(chunk_size=64 * 1024):
+                    if self.stop_event.is_set() or time.monotonic() > deadline:
+                        return None
+                    body.extend(chunk)
+                    if len(body) >= Config.WEB_MAX_PAGE_BYTES:
+                        logger.debug(f"Truncating {url} at {Config.WEB_MAX_PAGE_BYTES} bytes")
+                        del body[Config.WEB_MAX_PAGE_BYTES:]
+                        break
+                
+                metrics.inc('scraper_downloaded_bytes_total', len(body), source='Web')
+                content_hash = hashlib.blake2b(body, digest_size=16).hexdigest()
+                unchanged = entry is not None and entry[2] == content_hash
+                self.cache.record(url, 'unchanged' if unchanged else 'changed', len(body))
+                fresh = (response.headers.get('ETag'), response.headers.get('Last-Modified'),
+                         content_hash, len(body))
+                if unchanged:
+                    self.cache.put(url, *fresh)
+                    return None
+                return body.decode(response.encoding or 'utf-8', errors='replace'), fresh
         except Exception as e:
-            logger.error(f"Discord notification error: {e}")
+            logger.debug(f"Error scraping {url}: {e}")
+            return None
+    
+    def crawl(self, urls: Iterable[str]) -> Iterator[Tuple[str, str, Tuple]]:
+        """Fetch URLs concurrently and yield (url, html, cache_entry) in completion order.
+        
+        cache_entry is what fetch() returns alongside the page, to be stored once
+        the page has been processed.
+        
+        URLs are queued per host and only handed to the pool while their host
+        is under its limit. Whatever has not finished by Config.WEB_CRAWL_DEADLINE
+        is cancelled, as is everything still pending if the caller stops early.
+        """
+        deadline = time.monotonic() + Config.WEB_CRAWL_DEADLINE
+        queues: Dict[str, deque] = defaultdict(deque)
+        for url in urls:
+            queues[urlparse(url).hostname or ''].append(url)
+        futures: Dict[Future, str] = {}
+        try:
+            while not self.stop_event.is_set():
+                self._submit_ready(queues, futures, deadline)
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise FuturesTimeoutError()
+                if not futures:
+                    if not any(queues.values()):
+                        break
+                    # Every queued host is saturated by other crawls sharing the pool
+                    with self.host_slots:
+                        self.host_slots.wait(min(remaining, 0.5))
+                    continue
+                done, _ = wait(futures, timeout=remaining, return_when=FIRST_COMPLETED)
+                for future in done:
+                    url = futures.pop(future)
+                    fetched = future.result()
+                    if fetched:
+                        yield (url, *fetched)
+        except FuturesTimeoutError:
+            pending = len(futures) + sum(len(queued) for queued in queues.values())
+            logger.warning(f"Web crawl deadline reached, dropping {pending} pending pages")
+        finally:
+            for future in futures:
+                future.cancel()
+            self.cache.evict()
+            stats = self.cache.stats
+            logger.info(f"Fetch cache: {self.cache.hit_rate():.0%} of pages unchanged "
+                        f"({stats['not_modified']} not modified, {stats['unchanged']} same content, "
+                        f"{stats['bytes_saved']} bytes not re-parsed)")
+    
+    def close(self):
+        """Cancel in-flight downloads and release pooled connections."""
+        self.stop_event.set()
+        self.pool.shutdown(wait=True, cancel_futures=True)
+        self.session.close()
+        self.cache.close()
+
+class TextCollector:
+    """Collects visible text from parser events, skipping script and style content.
+    
+    Works as an lxml parser target and as the sink for StdlibTextParser, so
+    neither backend builds a document tree.
+    """
+    
+    SKIP_TAGS = frozenset(['script', 'style', 'noscript', 'template'])
+    
+    def __init__(self):
+        self.parts: List[str] = []
+        self.skip_depth = 0
+    
+    def start(self, tag: str, attrib=None):
+        if tag.lower() in self.SKIP_TAGS:
+            self.skip_depth += 1
+        # Tags separate words; text nodes themselves may arrive in several pieces
+        self.parts.append(' ')
+    
+    def end(self, tag: str):
+        if tag.lower() in self.SKIP_TAGS and self.skip_depth:
+            self.skip_depth -= 1
+        self.parts.append(' ')
+    
+    def data(self, data: str):
+        if not self.skip_depth:
+            self.parts.append(data)
+    
+    def comment(self, text: str):
+        pass
+    
+    def close(self) -> str:
+        return ''.join(self.parts)
+
+class StdlibTextParser(html.parser.HTMLParser):
+    """html.parser front end feeding a TextCollector."""
+    
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.collector = TextCollector()
+    
+    def handle_starttag(self, tag, attrs):
+        self.collector.start(tag)
+    
+    def handle_endtag(self, tag):
+        self.collector.end(tag)
+    
+    def handle_data(self, data):
+        self.collector.data(data)
+
+def html_to_text(page: str) -> str:
+    """Extract the visible text of an HTML page using Config.HTML_TEXT_BACKEND."""
+    backend = Config.HTML_TEXT_BACKEND
+    if backend == 'lxml' and etree is not None:
+        parser = etree.HTMLParser(target=TextCollector(), recover=True)
+        parser.feed(page)
+        return parser.close()
+    if backend == 'bs4':
+        return BeautifulSoup(page, 'html.parser').get_text()
+    parser = StdlibTextParser()
+    parser.feed(page)
+    parser.close()
+    return parser.collector.close()
+
+class CodeCandidate(NamedTuple):
+    """A possible invite code and how code-like it looks."""
+    code: str
+    score: int
+
+class InviteCodeExtractor:
+    """Keyword-anchored invite code extraction with cheap false-positive scoring.
+    
+    Texts without an invite keyword, in themselves or in the context they were
+    posted under, are rejected after a single regex scan. Otherwise only the
+    windows around keywords (or the whole text, when anchored by its context)
+    are searched, and each match is
+    scored on its character mix, a stopword list and whether it sits inside a
+    URL, so plain English words and URL fragments fall below MIN_CODE_SCORE.
+    """
+    
+    STOPWORDS = frozenset("""
+        farcaster warpcast invitation invitations invites inviting referral referrals
+        available everyone something anything community everybody
+        following followers followed download discord telegram twitter reddit
+        comments comment username password account accounts register registered
+        whitelist allowlist giveaway airdrop airdrops ethereum blockchain protocol
+        decentralized platform application ecosystem yesterday tomorrow actually
+        probably currently question questions interested interesting information
+        anyone someone because remember thousand hundreds together different
+        especially important beginning wondering wallet wallets network networks
+        anybody received sending getting looking waiting already without
+    """.split())
+    
+    def __init__(self):
+        self.code_re = re.compile(Config.INVITE_CODE_PATTERN)
+        self.keyword_re = re.compile(Config.INVITE_KEYWORD_PATTERN, re.IGNORECASE)
+        self.url_re = re.compile(r'(?:https?://|www\.)[^\s<>"\']+', re.IGNORECASE)
+        self.invite_url_re = re.compile(r'(?:invite|invitation|ref|referral|code|join)\w*[/=?]', re.IGNORECASE)
+    
+    def _windows(self, text: str) -> List[Tuple[int, int]]:
+        """Return merged (start, end) spans around every invite keyword."""
+        windows = []
+        for match in self.keyword_re.finditer(text):
+            start = max(0, match.start() - Config.CODE_CONTEXT_WINDOW)
+            end = min(len(text), match.end() + Config.CODE_CONTEXT_WINDOW)
+            if windows and start <= windows[-1][1]:
+                windows[-1] = (windows[-1][0], end)
+            else:
+                windows.append((start, end))
+        return windows
+    
+    def score(self, code: str, url: Optional[str]) -> int:
+        """Score how much a regex match looks like an invite code rather than a word."""
+        has_digit = any(c.isdigit() for c in code)
+        has_alpha = any(c.isalpha() for c in code)
+        score = 0
+        
+        if has_digit and has_alpha:
+            score += 2
+        elif has_alpha:
+            if code.lower() in self.STOPWORDS:
+                return -5
+            # All-lowercase, Titlecase or SHOUTING words are almost always prose
+            if code.islower() or code.istitle() or code.isupper():
+                score -= 2
+        else:
+            # Pure numbers are dates, IDs and phone numbers far more often than codes
+            score -= 1
+        
+        # Mixed case only counts alongside digits; letters-only CamelCase is brand
+        # and product names (WhatsApp, MetaMask, JavaScript), not codes
+        if has_digit and has_alpha and not code.islower() and not code.isupper() and not code.istitle():
+            score += 1
+        
+        if url is not None:
+            # Path segments after invite/ref/code are codes, anything else in a URL is not
+            prefix = url[:url.find(code)] if code in url else url
+            score += 2 if self.invite_url_re.search(prefix) else -3
+        return score
+    
+    def rank(self, text: str, context: Optional[str] = None) -> List[CodeCandidate]:
+        """Return scored candidates from text, best first, above MIN_CODE_SCORE.
+        
+        `context` is the text this one was posted under, such as the title of
+        the submission a comment replies to. An invite keyword there anchors the
+        whole text, so replies like "here you go: aB3dE9fG2h" are still searched.
+        """
+        if context and self.keyword_re.search(context):
+            windows = [(0, len(text))]
+        else:
+            windows = self._windows(text)
+        best: Dict[str, int] = {}
+        # Words repeat a lot in real text, so scores outside URLs are memoised per call
+        plain_scores: Dict[str, int] = {}
+        candidates = 0
+        for start, end in windows:
+            # Both match streams are in text order, so URLs are walked alongside codes
+            urls = self.url_re.finditer(text, start, end)
+            url_match = next(urls, None)
+            for match in self.code_re.finditer(text, start, end):
+                candidates += 1
+                while url_match is not None and url_match.end() <= match.start():
+                    url_match = next(urls, None)
+                in_url = url_match is not None and url_match.start() <= match.start()
+                url = url_match.group() if in_url else None
+                code = match.group()
+                if url is None:
+                    score = plain_scores.get(code)
+                    if score is None:
+                        score = plain_scores[code] = self.score(code, None)
+                else:
+                    score = self.score(code, url)
+                if score >= Config.MIN_CODE_SCORE and score > best.get(code, score - 1):
+                    best[code] = score
+        metrics.inc('scraper_code_candidates_total', candidates)
+        metrics.inc('scraper_codes_accepted_total', len(best))
+        return sorted((CodeCandidate(code, score) for code, score in best.items()),
+                      key=lambda candidate: candidate.score, reverse=True)
+
+def iter_comments(forest) -> Iterator:
+    """Yield every comment in a Reddit comment forest, depth first, as it is reached.
+    
+    Unlike CommentForest.list() nothing is flattened into a list up front, so
+    memory stays bounded by thread depth rather than comment count.
+    "Load more comments" stubs are skipped, as replace_more(limit=0) would do.
+    """
+    stack = [iter(forest)]
+    while stack:
+        comment = next(stack[-1], None)
+        if comment is None:
+            stack.pop()
+            continue
+        if isinstance(comment, praw.models.MoreComments):
+            continue
+        yield comment
+        stack.append(iter(comment.replies))
+
+class FixtureStore:
+    """Recorded source responses, one JSON file per source under Config.FIXTURES_DIR.
+    
+    twitter.json maps query -> tweets, reddit.json maps keyword -> submissions
+    with their comments, and web.json maps URL -> status, headers and body.
+    """
+    
+    SOURCES = ('twitter', 'reddit', 'web')
+    
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.lock = threading.Lock()
+        self.data: Dict[str, Dict] = {}
+        for source in self.SOURCES:
+            path = os.path.join(directory, f'{source}.json')
+            if os.path.exists(path):
+                with open(path) as f:
+                    self.data[source] = json.load(f)
+            else:
+                self.data[source] = {}
+    
+    def get(self, source: str, key: str, default=None):
+        with self.lock:
+            return self.data[source].get(key, default)
+    
+    def put(self, source: str, key: str, value):
+        with self.lock:
+            self.data[source][key] = value
+    
+    def save(self):
+        """Write every recorded source back to its fixture file."""
+        os.makedirs(self.directory, exist_ok=True)
+        with self.lock:
+            for source in self.SOURCES:
+                with open(os.path.join(self.directory, f'{source}.json'), 'w') as f:
+                    json.dump(self.data[source], f, indent=2)
+        logger.info(f"Saved fixtures to {self.directory}")
+
+class RecordingTwitterAPI:
+    """Passes searches through to tweepy and records the tweets returned."""
+    
+    def __init__(self, api, store: FixtureStore):
+        self.api = api
+        self.store = store
+    
+    def search_tweets(self, q: str, **kwargs):
+        tweets = self.api.search_tweets(q=q, **kwargs)
+        recorded = {str(tweet['id']): tweet for tweet in self.store.get('twitter', q, [])}
+        for tweet in tweets:
+            recorded[str(tweet.id)] = {'id': tweet.id, 'text': tweet.text,
+                                       'screen_name': tweet.user.screen_name}
+        self.store.put('twitter', q, list(recorded.values()))
+        return tweets
+
+class ReplayTwitterAPI:
+    """Stands in for tweepy.API, answering searches from recorded tweets."""
+    
+    def __init__(self, store: FixtureStore):
+        self.store = store
+    
+    def search_tweets(self, q: str, since_id: Optional[int] = None, count: int = 100, **kwargs):
+        tweets = sorted(self.store.get('twitter', q, []), key=lambda tweet: tweet['id'], reverse=True)
+        return [SimpleNamespace(id=tweet['id'], text=tweet['text'],
+                                user=SimpleNamespace(screen_name=tweet['screen_name']))
+                for tweet in tweets if since_id is None or tweet['id'] > since_id][:count]
+
+class RecordingSubreddit:
+    """Passes Reddit searches through to praw and records submissions and comments."""
+    
+    def __init__(self, subreddit, store: FixtureStore):
+        self.subreddit = subreddit
+        self.store = store
+    
+    def search(self, keyword: str, limit: int = 100):
+        recorded = []
+        for submission in self.subreddit.search(keyword, limit=limit):
+            recorded.append({
+                'id': submission.id,
+                'title': submission.title,
+                'selftext': submission.selftext,
+                'url': submission.url,
+                'num_comments': submission.num_comments,
+                'comments': [{'id': comment.id, 'body': comment.body, 'created_utc': comment.created_utc}
+                             for comment in iter_comments(submission.comments)]
+            })
+            yield submission
+        self.store.put('reddit', keyword, recorded)
+
+class RecordingReddit:
+    def __init__(self, reddit, store: FixtureStore):
+        self.reddit = reddit
+        self.store = store
+    
+    def subreddit(self, name: str) -> RecordingSubreddit:
+        return RecordingSubreddit(self.reddit.subreddit(name), self.store)
+
+class ReplayCommentForest:
+    """Minimal stand-in for praw's CommentForest over recorded comments.
+    
+    Comments are recorded flattened, so every one is top level with no replies.
+    """
+    
+    def __init__(self, comments: List[Dict]):
+        self.comments = [SimpleNamespace(replies=[], **comment) for comment in comments]
+    
+    def __iter__(self) -> Iterator[SimpleNamespace]:
+        return iter(self.comments)
+    
+    def replace_more(self, limit: Optional[int] = None):
+        return []
+    
+    def list(self) -> List[SimpleNamespace]:
+        return list(self.comments)
+
+class ReplayReddit:
+    """Stands in for praw.Reddit, answering searches from recorded submissions."""
+    
+    def __init__(self, store: FixtureStore):
+        self.store = store
+    
+    def subreddit(self, name: str) -> 'ReplayReddit':
+        return self
+    
+    def search(self, keyword: str, limit: int = 100) -> Iterator[SimpleNamespace]:
+        for submission in self.store.get('reddit', keyword, [])[:limit]:
+            fields = {key: value for key, value in submission.items() if key != 'comments'}
+            yield SimpleNamespace(comments=ReplayCommentForest(submission['comments']), **fields)
+
+class ReplayAdapter(HTTPAdapter):
+    """requests transport that serves recorded web responses instead of the network.
+    
+    Unrecorded URLs get a 404, so a replay never leaves the machine.
+    """
+    
+    def __init__(self, store: FixtureStore):
+        super().__init__()
+        self.store = store
+    
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        recorded = self.store.get('web', request.url, {'status': 404, 'headers': {}, 'body': ''})
+        response = requests.Response()
+        response.status_code = recorded['status']
+        response.headers = CaseInsensitiveDict(recorded['headers'])
+        response.raw = io.BytesIO(recorded['body'].encode())
+        response.encoding = get_encoding_from_headers(response.headers) or 'utf-8'
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+
+class ReplayNotifier:
+    """Stands in for NotificationService during replays: codes are kept, never sent."""
+    
+    def __init__(self):
+        self.sent: List[Tuple[str, str, str]] = []
+    
+    def notify(self, code: str, source: str, url: str):
+        self.sent.append((code, source, url))
+    
+    def close(self, timeout: Optional[float] = None):
+        logger.info(f"Replay would have sent {len(self.sent)} notifications")
+
+def record_web_response(store: FixtureStore):
+    """Build a requests response hook that records every web response into the store."""
+    def hook(response, *args, **kwargs):
+        if response.status_code == 200:
+            store.put('web', response.url, {
+                'status': response.status_code,
+                'headers': {key: value for key, value in response.headers.items()
+                            if key.lower() in ('content-type', 'etag', 'last-modified')},
+                'body': response.content.decode(response.encoding or 'utf-8', errors='replace')
+            })
+        return response
+    return hook
 
 class InviteCodeScraper:
     """Main scraper class that coordinates all source-specific scrapers."""
     
+    # Held by the source run being profiled when only one profiler may be active
+    profile_lock = threading.Lock()
+    
     def __init__(self):
         self.db = Database()
-        self.notification = NotificationService()
+        self.seen_codes = SeenCodeCache.from_database(self.db)
+        # Replays must not message anyone or hit the validator, and benchmarks
+        # should not measure them
+        offline = Config.REPLAY_MODE in ('replay', 'benchmark')
+        self.notification = ReplayNotifier() if offline else NotificationService()
+        self.crawler = PageCrawler()
+        self.extractor = InviteCodeExtractor()
+        self.verifier = VerificationStage(self.db, HttpCodeValidator(Config.VALIDATOR_URL)) \
+            if Config.VALIDATOR_URL and not offline else None
+        self.found_codes: List[Tuple[str, str, str]] = []
+        # Source progress keyed by (kind, id), written with the next flushed batch
+        self.pending_progress: Dict[Tuple[str, str], tuple] = {}
+        self.found_lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.seen_tweet_ids = set()
+        self.new_code_counts: Dict[str, int] = {}
+        self.tweet_ids_lock = threading.Lock()
         self.setup_apis()
     
     def setup_apis(self):
@@ -175,118 +1602,685 @@ class InviteCodeScraper:
         else:
             self.reddit_api = None
             logger.warning("Reddit API credentials not found")
+        
+        # Offline record/replay of every source
+        self.fixtures = None
+        if Config.REPLAY_MODE in ('replay', 'benchmark'):
+            self.fixtures = FixtureStore(Config.FIXTURES_DIR)
+            self.twitter_api = ReplayTwitterAPI(self.fixtures)
+            self.reddit_api = ReplayReddit(self.fixtures)
+            adapter = ReplayAdapter(self.fixtures)
+            self.crawler.session.mount('http://', adapter)
+            self.crawler.session.mount('https://', adapter)
+            logger.info(f"Replaying sources from {Config.FIXTURES_DIR}")
+        elif Config.REPLAY_MODE == 'record':
+            self.fixtures = FixtureStore(Config.FIXTURES_DIR)
+            if self.twitter_api:
+                self.twitter_api = RecordingTwitterAPI(self.twitter_api, self.fixtures)
+            if self.reddit_api:
+                self.reddit_api = RecordingReddit(self.reddit_api, self.fixtures)
+            self.crawler.session.hooks['response'].append(record_web_response(self.fixtures))
+            logger.info(f"Recording sources to {Config.FIXTURES_DIR}")
     
-    def extract_invite_codes(self, text: str) -> List[str]:
-        """Extract potential invite codes from text using regex."""
-        return re.findall(Config.INVITE_CODE_PATTERN, text)
+    def extract_invite_codes(self, text: str, context: Optional[str] = None) -> List[str]:
+        """Extract likely invite codes from text, most code-like first.
+        
+        `context` is the parent text (e.g. a submission title) used as the keyword anchor.
+        """
+        return [candidate.code for candidate in self.extractor.rank(text, context)]
     
     def process_found_code(self, code: str, source: str, url: str):
-        """Process and store a newly found invite code."""
-        if not self.db.is_code_exists(code):
-            if self.db.add_code(code, source, url):
-                logger.info(f"New code found: {code} from {source}")
-                self.notification.send_telegram_notification(code, source, url)
-                self.notification.send_discord_notification(code, source, url)
-    
-    def search_twitter(self):
-        """Search Twitter for invite codes."""
+        """Queue a found invite code for the next batched database write."""
+        if self.seen_codes.seen(code):
+            return
+        with self.found_lock:
+            self.found_codes.append((code, source, url))
+            flush_now = len(self.found_codes) >= Config.INGEST_BATCH_SIZE
+        if flush_now:
+            self.flush_found_codes()
+    
+    def queue_progress(self, kind: str, values: tuple):
+        """Queue source progress (see Database.PROGRESS_UPSERTS) behind the codes found so far.
+        
+        It is only written together with those codes, so a failed or skipped
+        flush never leaves a cursor pointing past codes that were not stored.
+        'web' progress is a crawled page's FetchCache entry, stored after the commit.
+        """
+        with self.found_lock:
+            self.pending_progress[(kind, values[0])] = values
+    
+    def queued_progress(self, kind: str, key: str) -> Optional[tuple]:
+        """Return progress queued for a key but not yet written."""
+        with self.found_lock:
+            return self.pending_progress.get((kind, key))
+    
+    def flush_found_codes(self) -> List[Tuple[str, str, str]]:
+        """Write all queued codes and progress in one transaction and notify about new codes.
+        
+        With a validator configured, new codes are handed to the verification
+        stage, which notifies them once checked and skips those found invalid.
+        If the write fails the batch is queued again, ahead of anything found since,
+        and retried on the next flush.
+        """
+        with self.flush_lock:
+            with self.found_lock:
+                batch, self.found_codes = self.found_codes, []
+                progress, self.pending_progress = self.pending_progress, {}
+            new_codes = self.db.add_codes(batch, [(kind, values) for (kind, _), values in progress.items()
+                                                  if kind in Database.PROGRESS_UPSERTS])
+            if new_codes is None:
+                with self.found_lock:
+                    self.found_codes[:0] = batch
+                    # Progress queued since is newer than the failed batch's
+                    for key, values in progress.items():
+                        self.pending_progress.setdefault(key, values)
+                logger.warning(f"Write failed, keeping {len(batch)} codes queued for the next flush")
+                return []
+            # Crawled pages' cache entries live in the fetch cache's own database
+            for (kind, _), values in progress.items():
+                if kind == 'web':
+                    self.crawler.cache.put(*values)
+            # Only committed codes may be skipped from now on
+            for code, _, _ in batch:
+                self.seen_codes.add(code)
+        for code, source, url in new_codes:
+            self.new_code_counts[source] = self.new_code_counts.get(source, 0) + 1
+            metrics.inc('scraper_new_codes_total', source=source)
+            logger.info(f"New code found: {code} from {source}")
+        if self.verifier and new_codes:
+            self.verifier.submit(new_codes, self.notification.notify)
+        else:
+            for code, source, url in new_codes:
+                self.notification.notify(code, source, url)
+        return new_codes
+    
+    def twitter_queries(self) -> List[str]:
+        """Return the Twitter search queries to run, combined into one if configured."""
+        if Config.TWITTER_COMBINED_QUERY:
+            return [" OR ".join(f'"{keyword}"' for keyword in Config.SEARCH_KEYWORDS)]
+        return list(Config.SEARCH_KEYWORDS)
+    
+    def search_twitter_keyword(self, keyword: str):
+        """Search Twitter for invite codes in tweets newer than the query's cursor.
+        
+        Tweets already processed this iteration under another keyword are skipped.
+        The advanced cursor is queued behind the tweets' codes and only written with them.
+        """
         if not self.twitter_api:
             return
         
         try:
-            for keyword in Config.SEARCH_KEYWORDS:
-                tweets = self.twitter_api.search_tweets(q=keyword, lang="en", count=100)
-                for tweet in tweets:
-                    codes = self.extract_invite_codes(tweet.text)
-                    for code in codes:
-                        url = f"https://twitter.com/{tweet.user.screen_name}/status/{tweet.id}"
-                        self.process_found_code(code, "Twitter", url)
+            queued = self.queued_progress('twitter', keyword)
+            since_id = queued[1] if queued else self.db.get_twitter_cursor(keyword)
+            with metrics.timer('scraper_fetch_seconds', source='Twitter'):
+                tweets = self.twitter_api.search_tweets(q=keyword, lang="en", count=100, since_id=since_id)
+            newest = since_id or 0
+            for tweet in tweets:
+                newest = max(newest, tweet.id)
+                with self.tweet_ids_lock:
+                    if tweet.id in self.seen_tweet_ids:
+                        continue
+                    self.seen_tweet_ids.add(tweet.id)
+                codes = self.extract_invite_codes(tweet.text)
+                for code in codes:
+                    url = f"https://twitter.com/{tweet.user.screen_name}/status/{tweet.id}"
+                    self.process_found_code(code, "Twitter", url)
+            if newest and newest != since_id:
+                self.queue_progress('twitter', (keyword, newest))
         except Exception as e:
-            logger.error(f"Twitter search error: {e}")
+            logger.error(f"Twitter search error for '{keyword}': {e}")
     
-    def search_reddit(self):
-        """Search Reddit for invite codes."""
+    def search_reddit_keyword(self, keyword: str):
+        """Search Reddit for invite codes matching a single keyword.
+        
+        Submissions are scanned incrementally: one whose comment count has not
+        changed since the last run is skipped without fetching its comments, and
+        otherwise only comments newer than the stored high-water mark are scanned.
+        The new mark is queued behind the submission's codes and only written with them.
+        """
         if not self.reddit_api:
             return
         
+        scanned = skipped = 0
         try:
-            for keyword in Config.SEARCH_KEYWORDS:
-                for submission in self.reddit_api.subreddit("all").search(keyword, limit=100):
-                    # Search in submission title and body
-                    text = f"{submission.title} {submission.selftext}"
-                    codes = self.extract_invite_codes(text)
+            for submission in self.reddit_api.subreddit("all").search(keyword, limit=100):
+                # State queued by another keyword this run is newer than the stored one
+                queued = self.queued_progress('reddit', submission.id)
+                state = queued[1:] if queued else self.db.get_reddit_state(submission.id)
+                if state is not None and state[0] == submission.num_comments:
+                    skipped += 1
+                    continue
+                scanned += 1
+                
+                if state is None:
+                    # Search in submission title and body; a keyword in the title anchors the body
+                    for text, context in ((submission.title, None), (submission.selftext, submission.title)):
+                        for code in self.extract_invite_codes(text, context=context):
+                            self.process_found_code(code, "Reddit", submission.url)
+                
+                # Stream comments posted since the last scan
+                last_seen = state[1] if state is not None else 0.0
+                newest = last_seen
+                with metrics.timer('scraper_fetch_seconds', source='Reddit'):
+                    forest = submission.comments
+                for comment in iter_comments(forest):
+                    if comment.created_utc <= last_seen:
+                        continue
+                    newest = max(newest, comment.created_utc)
+                    codes = self.extract_invite_codes(comment.body, context=submission.title)
                     for code in codes:
-                        self.process_found_code(code, "Reddit", submission.url)
-                    
-                    # Search in comments
-                    submission.comments.replace_more(limit=0)
-                    for comment in submission.comments.list():
-                        codes = self.extract_invite_codes(comment.body)
-                        for code in codes:
-                            self.process_found_code(code, "Reddit", f"{submission.url}{comment.id}")
+                        self.process_found_code(code, "Reddit", f"{submission.url}{comment.id}")
+                self.queue_progress('reddit', (submission.id, submission.num_comments, newest))
         except Exception as e:
-            logger.error(f"Reddit search error: {e}")
+            logger.error(f"Reddit search error for '{keyword}': {e}")
+        logger.info(f"Reddit '{keyword}': scanned {scanned} submissions, skipped {skipped} unchanged")
     
-    def search_web(self):
-        """Search Google and scrape web results for invite codes."""
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+    def search_web_keyword(self, keyword: str):
+        """Search Google for a single keyword and scrape the results for invite codes."""
+        try:
+            search_url = f"https://www.google.com/search?q={keyword}"
+            with metrics.timer('scraper_fetch_seconds', source='Google'):
+                response = self.crawler.session.get(search_url, timeout=Config.WEB_FETCH_TIMEOUT)
+            metrics.inc('scraper_downloaded_bytes_total', len(response.content), source='Google')
+            soup = BeautifulSoup(response.text, 'html.parser')
+            
+            # Extract search result links, then visit them concurrently
+            urls = []
+            for link in soup.find_all('a'):
+                url = link.get('href', '')
+                if url.startswith('http') and not any(domain in url for domain in ['google.com', 'twitter.com', 'reddit.com']):
+                    if url not in urls:
+                        urls.append(url)
+            
+            for url, page, cache_entry in self.crawler.crawl(urls):
+                text = html_to_text(page)
+                codes = self.extract_invite_codes(text)
+                for code in codes:
+                    self.process_found_code(code, "Web", url)
+                # The page only counts as seen once its codes are stored
+                self.queue_progress('web', (url, *cache_entry))
+        except Exception as e:
+            logger.error(f"Web search error for '{keyword}': {e}")
+    
+    def source_searches(self) -> Dict[str, Callable[[str], None]]:
+        """Map each source name to its per-keyword search method."""
+        return {
+            "Twitter": self.search_twitter_keyword,
+            "Reddit": self.search_reddit_keyword,
+            "Web": self.search_web_keyword
         }
+    
+    def source_keywords(self, source: str) -> List[str]:
+        """Return the keywords or queries a source is searched with."""
+        if source == "Twitter":
+            return self.twitter_queries()
+        return list(Config.SEARCH_KEYWORDS)
+    
+    def run_search(self) -> int:
+        """Run every source once, all at the same time, and return how many new codes were found.
+        
+        Sources run on their own threads and each searches its keywords on up to
+        SOURCE_CONCURRENCY more, so a slow source does not hold up the others.
+        The scheduler in main() runs each source on its own interval instead;
+        this single pass is what the replay benchmark measures.
+        """
+        logger.info("Starting search iteration...")
+        started = time.monotonic()
+        sources = list(self.source_searches())
+        with ThreadPoolExecutor(max_workers=len(sources), thread_name_prefix="source") as pool:
+            new_codes = sum(pool.map(self.run_source, sources))
+        stats = self.seen_codes.stats()
+        logger.info(f"{new_codes} new codes this iteration "
+                    f"(seen-code cache: {stats['hits']} hits, {stats['misses']} misses)")
+        metrics.observe('scraper_iteration_seconds', time.monotonic() - started, source='all')
+        self.export_metrics()
+        logger.info(f"Search iteration completed in {time.monotonic() - started:.2f}s")
+        return new_codes
+    
+    def run_source(self, source: str) -> int:
+        """Run one source across all its keywords and return how many new codes it found."""
+        searches = self.source_searches()
+        keywords = self.source_keywords(source)
+        if source == "Twitter":
+            with self.tweet_ids_lock:
+                self.seen_tweet_ids.clear()
+        
+        started = time.monotonic()
+        before = self.new_code_counts.get(source, 0)
+        search = searches[source]
+        profiles: List[cProfile.Profile] = []
+        if Config.PROFILE_DIR and PROFILE_PER_THREAD:
+            self._search_keywords(source, self._profiled(search, profiles), keywords)
+        elif Config.PROFILE_DIR and self.profile_lock.acquire(blocking=False):
+            # One profiler for the whole run, with its keywords searched one at a time
+            try:
+                profile = cProfile.Profile()
+                profiles.append(profile)
+                profile.runcall(self._search_keywords, source, search, keywords, False)
+            finally:
+                self.profile_lock.release()
+        else:
+            if Config.PROFILE_DIR:
+                logger.info(f"Not profiling this {source} run, another source is being profiled")
+            self._search_keywords(source, search, keywords)
+        self.flush_found_codes()
         
+        metrics.observe('scraper_iteration_seconds', time.monotonic() - started, source=source)
+        if profiles:
+            self.save_profile(source, profiles)
+        self.export_metrics()
+        return self.new_code_counts.get(source, 0) - before
+    
+    @staticmethod
+    def _search_keywords(source: str, search: Callable[[str], None], keywords: List[str],
+                         concurrent: bool = True):
+        """Search every keyword, on up to SOURCE_CONCURRENCY threads or inline one at a time."""
+        if not concurrent:
+            for keyword in keywords:
+                try:
+                    search(keyword)
+                except Exception as e:
+                    logger.error(f"{source} search job failed: {e}")
+            return
+        workers = Config.SOURCE_CONCURRENCY.get(source, 1)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"search-{source}") as pool:
+            for future in as_completed([pool.submit(search, keyword) for keyword in keywords]):
+                try:
+                    future.result()
+                except Exception as e:
+                    logger.error(f"{source} search job failed: {e}")
+    
+    @staticmethod
+    def _profiled(search: Callable[[str], None], profiles: List[cProfile.Profile]) -> Callable[[str], None]:
+        """Wrap a search so each call is profiled on the worker thread that runs it."""
+        def run(keyword: str):
+            profile = cProfile.Profile()
+            profiles.append(profile)
+            profile.runcall(search, keyword)
+        return run
+    
+    @staticmethod
+    def save_profile(source: str, profiles: List[cProfile.Profile]):
+        """Merge a run's per-thread profiles into one .prof file under Config.PROFILE_DIR."""
+        os.makedirs(Config.PROFILE_DIR, exist_ok=True)
+        path = os.path.join(Config.PROFILE_DIR, f"{source}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.prof")
+        pstats.Stats(*profiles).dump_stats(path)
+        logger.info(f"Saved {source} profile to {path}")
+    
+    @staticmethod
+    def export_metrics():
+        """Rewrite the Prometheus metrics file."""
         try:
-            for keyword in Config.SEARCH_KEYWORDS:
-                search_url = f"https://www.google.com/search?q={keyword}"
-                response = requests.get(search_url, headers=headers)
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
-                # Extract and visit search result links
-                for link in soup.find_all('a'):
-                    url = link.get('href', '')
-                    if url.startswith('http') and not any(domain in url for domain in ['google.com', 'twitter.com', 'reddit.com']):
-                        try:
-                            page_response = requests.get(url, headers=headers, timeout=10)
-                            page_soup = BeautifulSoup(page_response.text, 'html.parser')
-                            text = page_soup.get_text()
-                            codes = self.extract_invite_codes(text)
-                            for code in codes:
-                                self.process_found_code(code, "Web", url)
-                        except Exception as e:
-                            logger.debug(f"Error scraping {url}: {e}")
+            metrics.write(Config.METRICS_PATH)
+        except OSError as e:
+            logger.error(f"Could not write metrics: {e}")
+    
+    def close(self):
+        """Stop background work and release network resources."""
+        self.crawler.close()
+        if self.verifier:
+            self.verifier.close()
+        if Config.REPLAY_MODE == 'record':
+            self.fixtures.save()
+        self.notification.close(timeout=Config.NOTIFY_TIMEOUT * 2)
+
+class JobQueue:
+    """SQLite-backed queue of (source, keyword) jobs shared by worker processes.
+    
+    Claiming is a single UPDATE ... RETURNING, so each pending job goes to
+    exactly one worker even with many processes polling at once.
+    """
+    
+    def __init__(self, path: str = None):
+        self.conn = sqlite3.connect(path or Config.QUEUE_PATH, timeout=30)
+        Database.configure_connection(self.conn)
+        with self.conn:
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    source TEXT,
+                    keyword TEXT,
+                    status TEXT DEFAULT 'pending',
+                    worker TEXT,
+                    attempts INTEGER DEFAULT 0,
+                    claimed_at REAL
+                )
+            ''')
+            self.conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, id)')
+    
+    def enqueue(self, jobs: Iterable[Tuple[str, str]]) -> int:
+        """Add jobs that are not already pending or running; return how many were added."""
+        added = 0
+        with self.conn:
+            for source, keyword in jobs:
+                cursor = self.conn.execute('''
+                    INSERT INTO jobs (source, keyword)
+                    SELECT ?, ? WHERE NOT EXISTS (
+                        SELECT 1 FROM jobs
+                        WHERE source = ? AND keyword = ? AND status IN ('pending', 'running')
+                    )
+                ''', (source, keyword, source, keyword))
+                added += cursor.rowcount
+        return added
+    
+    def claim(self, worker: str) -> Optional[Tuple[int, str, str]]:
+        """Atomically take the oldest pending job, returning (id, source, keyword)."""
+        with self.conn:
+            return self.conn.execute('''
+                UPDATE jobs SET status = 'running', worker = ?, claimed_at = ?, attempts = attempts + 1
+                WHERE id = (SELECT id FROM jobs WHERE status = 'pending' ORDER BY id LIMIT 1)
+                RETURNING id, source, keyword
+            ''', (worker, time.time())).fetchone()
+    
+    def complete(self, job_id: int):
+        with self.conn:
+            self.conn.execute("UPDATE jobs SET status = 'done' WHERE id = ?", (job_id,))
+    
+    def fail(self, job_id: int):
+        """Put a failed job back in the queue unless it has used up its attempts."""
+        with self.conn:
+            self.conn.execute('''
+                UPDATE jobs SET status = CASE WHEN attempts < ? THEN 'pending' ELSE 'failed' END
+                WHERE id = ?
+            ''', (Config.WORKER_MAX_ATTEMPTS, job_id))
+    
+    def requeue_stale(self):
+        """Return jobs claimed by workers that died without finishing them."""
+        with self.conn:
+            cursor = self.conn.execute('''
+                UPDATE jobs SET status = 'pending'
+                WHERE status = 'running' AND claimed_at < ?
+            ''', (time.time() - Config.WORKER_JOB_TIMEOUT,))
+        if cursor.rowcount:
+            logger.warning(f"Requeued {cursor.rowcount} stale jobs")
+    
+    def purge_finished(self):
+        with self.conn:
+            self.conn.execute("DELETE FROM jobs WHERE status = 'done'")
+    
+    def close(self):
+        self.conn.close()
+
+class WorkerScraper(InviteCodeScraper):
+    """Scraper run inside a worker process.
+    
+    It searches and extracts as usual but never writes codes, progress or
+    notifications; each flushed batch goes to the writer process over a
+    multiprocessing queue as (codes, progress).
+    """
+    
+    def __init__(self, results):
+        self.results = results
+        super().__init__()
+    
+    def flush_found_codes(self) -> List[Tuple[str, str, str]]:
+        with self.found_lock:
+            batch, self.found_codes = self.found_codes, []
+            progress, self.pending_progress = self.pending_progress, {}
+        if batch or progress:
+            self.results.put((batch, [(kind, values) for (kind, _), values in progress.items()]))
+            for code, _, _ in batch:
+                self.seen_codes.add(code)
+        return []
+
+def worker_main(worker: str, results):
+    """Entry point of a worker process: run queued jobs until the queue is empty."""
+    scraper = WorkerScraper(results)
+    jobs = JobQueue()
+    searches = scraper.source_searches()
+    try:
+        while True:
+            job = jobs.claim(worker)
+            if job is None:
+                break
+            job_id, source, keyword = job
+            try:
+                searches[source](keyword)
+                scraper.flush_found_codes()
+                jobs.complete(job_id)
+            except Exception as e:
+                logger.error(f"{worker}: {source} job for '{keyword}' failed: {e}")
+                jobs.fail(job_id)
+    finally:
+        jobs.close()
+        scraper.close()
+
+def run_workers(scraper: InviteCodeScraper, processes: int) -> int:
+    """Run one iteration across worker processes, with this process as the only writer.
+    
+    Workers pull (source, keyword) jobs from the shared JobQueue and send their
+    candidates and source progress back; only the writer stores them, and since add_codes reports
+    exactly which codes were new, each code is stored and notified once.
+    """
+    started = time.monotonic()
+    jobs = JobQueue()
+    jobs.requeue_stale()
+    jobs.purge_finished()
+    added = jobs.enqueue((source, keyword)
+                         for source in scraper.source_searches()
+                         for keyword in scraper.source_keywords(source))
+    jobs.close()
+    logger.info(f"Queued {added} jobs for {processes} worker processes")
+    
+    # Spawned workers start from a clean interpreter instead of a fork of this
+    # one, which holds SQLite connections, locks and running threads
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    workers = [context.Process(target=worker_main, args=(f"worker-{index}", results),
+                               name=f"worker-{index}")
+               for index in range(processes)]
+    for worker in workers:
+        worker.start()
+    
+    new_codes = 0
+    while True:
+        try:
+            batch, progress = results.get(timeout=1)
+        except queue.Empty:
+            if not any(worker.is_alive() for worker in workers):
+                break
+            continue
+        for code, source, url in batch:
+            scraper.process_found_code(code, source, url)
+        for kind, values in progress:
+            scraper.queue_progress(kind, values)
+        new_codes += len(scraper.flush_found_codes())
+    for worker in workers:
+        worker.join()
+    # Retry anything a failed write left queued
+    new_codes += len(scraper.flush_found_codes())
+    
+    metrics.observe('scraper_iteration_seconds', time.monotonic() - started, source='workers')
+    scraper.export_metrics()
+    logger.info(f"Worker iteration completed in {time.monotonic() - started:.2f}s, {new_codes} new codes")
+    return new_codes
+
+class SourceJob:
+    """Schedule state and run-duration metrics for one source."""
+    
+    def __init__(self, source: str):
+        self.source = source
+        self.interval = Config.SOURCE_INTERVALS.get(source, Config.SEARCH_INTERVAL) * 60
+        self.current_interval = self.interval
+        self.next_run = time.monotonic()  # run immediately on start
+        self.running = False
+        self.runs = 0
+        self.last_duration = 0.0
+        self.total_duration = 0.0
+        self.max_duration = 0.0
+        self.last_new_codes = 0
+    
+    def record(self, duration: float, new_codes: int):
+        """Record a finished run and work out when the next one is due."""
+        self.runs += 1
+        self.last_duration = duration
+        self.total_duration += duration
+        self.max_duration = max(self.max_duration, duration)
+        self.last_new_codes = new_codes
+        
+        if new_codes:
+            self.current_interval = self.interval
+        else:
+            self.current_interval = min(self.current_interval * Config.SCHEDULE_BACKOFF_FACTOR,
+                                        self.interval * Config.SCHEDULE_MAX_BACKOFF)
+        jitter = random.uniform(-Config.SCHEDULE_JITTER, Config.SCHEDULE_JITTER)
+        self.next_run = time.monotonic() + self.current_interval * (1 + jitter)
+    
+    def metrics(self) -> Dict[str, float]:
+        return {
+            'runs': self.runs,
+            'last_duration': self.last_duration,
+            'avg_duration': self.total_duration / self.runs if self.runs else 0.0,
+            'max_duration': self.max_duration,
+            'last_new_codes': self.last_new_codes,
+            'interval': self.current_interval
+        }
+
+class SourceScheduler:
+    """Runs each source on its own adaptive interval without overlapping runs.
+    
+    A source is never started again while its previous run is in flight, so
+    overruns simply delay its next run. shutdown() stops new runs and waits
+    for in-flight ones to finish. Per-source run metrics are published as
+    scraper_source_* gauges.
+    """
+    
+    # SourceJob.metrics() keys and the metric each is published as
+    PUBLISHED_METRICS = {
+        'runs': 'scraper_source_runs_total',
+        'last_duration': 'scraper_source_last_run_seconds',
+        'avg_duration': 'scraper_source_avg_run_seconds',
+        'max_duration': 'scraper_source_max_run_seconds',
+        'last_new_codes': 'scraper_source_last_new_codes',
+        'interval': 'scraper_source_interval_seconds'
+    }
+    
+    def __init__(self, scraper: InviteCodeScraper):
+        self.scraper = scraper
+        self.jobs = {source: SourceJob(source) for source in scraper.source_searches()}
+        self.pool = ThreadPoolExecutor(max_workers=len(self.jobs), thread_name_prefix="source")
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        for source in self.jobs:
+            for key, name in self.PUBLISHED_METRICS.items():
+                metrics.gauge(name, lambda source=source, key=key: self.metrics()[source][key], source=source)
+    
+    def _run_job(self, job: SourceJob):
+        started = time.monotonic()
+        new_codes = 0
+        try:
+            new_codes = self.scraper.run_source(job.source)
         except Exception as e:
-            logger.error(f"Web search error: {e}")
+            logger.error(f"{job.source} run failed: {e}")
+        finally:
+            with self.lock:
+                job.record(time.monotonic() - started, new_codes)
+                job.running = False
+            self.scraper.export_metrics()
+            logger.info(f"{job.source}: run took {job.last_duration:.2f}s, {new_codes} new codes, "
+                        f"next run in {job.current_interval / 60:.1f} min")
     
-    def run_search(self):
-        """Run all search methods."""
-        logger.info("Starting search iteration...")
-        self.search_twitter()
-        self.search_reddit()
-        self.search_web()
-        logger.info("Search iteration completed")
+    def start(self):
+        """Dispatch due sources until shutdown() is called."""
+        while not self.stop_event.is_set():
+            with self.lock:
+                now = time.monotonic()
+                for job in self.jobs.values():
+                    if not job.running and now >= job.next_run:
+                        job.running = True
+                        self.pool.submit(self._run_job, job)
+                idle = [job.next_run for job in self.jobs.values() if not job.running]
+            wait = min(idle) - time.monotonic() if idle else 1.0
+            self.stop_event.wait(min(max(wait, 0.05), 1.0))
+    
+    def shutdown(self):
+        """Stop scheduling new runs and drain the ones in flight."""
+        self.stop_event.set()
+        self.pool.shutdown(wait=True)
+    
+    def metrics(self) -> Dict[str, Dict[str, float]]:
+        """Return run-duration metrics per source."""
+        with self.lock:
+            return {source: job.metrics() for source, job in self.jobs.items()}
+
+def run_replay_benchmark(iterations: int):
+    """Replay recorded fixtures through full search iterations and report throughput.
+    
+    Every iteration starts from empty databases so incremental state from the
+    previous one does not hide work.
+    """
+    logger.info(f"Benchmarking {iterations} replayed iterations from {Config.FIXTURES_DIR}")
+    db_path, cache_path = Config.DB_PATH, Config.FETCH_CACHE_PATH
+    total_codes = 0
+    tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        for _ in range(iterations):
+            with tempfile.TemporaryDirectory() as workdir:
+                Config.DB_PATH = os.path.join(workdir, 'codes.db')
+                Config.FETCH_CACHE_PATH = os.path.join(workdir, 'fetch_cache.db')
+                scraper = InviteCodeScraper()
+                scraper.run_search()
+                total_codes += scraper.db.count_codes()
+                scraper.close()
+                scraper.db.conn.close()
+    finally:
+        Config.DB_PATH, Config.FETCH_CACHE_PATH = db_path, cache_path
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    
+    logger.info(f"Replay benchmark: {iterations / elapsed:.2f} iterations/s, "
+                f"{total_codes / elapsed:.1f} codes/s, peak memory {peak / 1024 / 1024:.1f} MiB")
+    return {'iterations_per_second': iterations / elapsed,
+            'codes_per_second': total_codes / elapsed,
+            'peak_memory_bytes': peak}
 
 def main():
     """Main function to initialize and run the scraper."""
+    if Config.REPLAY_MODE == 'benchmark':
+        run_replay_benchmark(Config.BENCHMARK_ITERATIONS)
+        return
+    
     logger.info("Initializing Farcaster Invite Code Scraper...")
     
     # Create scraper instance
     scraper = InviteCodeScraper()
+    if scraper.verifier:
+        scraper.verifier.start_rechecks()
+    
+    if Config.METRICS_PORT:
+        metrics.serve(Config.METRICS_PORT)
+    
+    if Config.WORKER_PROCESSES:
+        stop_event = threading.Event()
+        signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
+        logger.info(f"Running {Config.WORKER_PROCESSES} worker processes every {Config.SEARCH_INTERVAL} minutes.")
+        try:
+            while not stop_event.is_set():
+                run_workers(scraper, Config.WORKER_PROCESSES)
+                stop_event.wait(Config.SEARCH_INTERVAL * 60)
+        except KeyboardInterrupt:
+            logger.info("Scraper stopped by user")
+        finally:
+            scraper.close()
+        return
     
     # Create scheduler
-    scheduler = BlockingScheduler()
-    scheduler.add_job(
-        scraper.run_search,
-        trigger=IntervalTrigger(minutes=Config.SEARCH_INTERVAL),
-        next_run_time=datetime.now()  # Run immediately on start
-    )
+    scheduler = SourceScheduler(scraper)
+    signal.signal(signal.SIGTERM, lambda signum, frame: scheduler.stop_event.set())
     
     try:
-        logger.info(f"Scheduler started. Running every {Config.SEARCH_INTERVAL} minutes.")
+        intervals = ", ".join(f"{source} every {job.interval / 60:g}" for source, job in scheduler.jobs.items())
+        logger.info(f"Scheduler started. Running {intervals} minutes.")
         scheduler.start()
     except KeyboardInterrupt:
         logger.info("Scraper stopped by user")
-        scheduler.shutdown()
     except Exception as e:
         logger.error(f"Unexpected error: {e}")
+    finally:
         scheduler.shutdown()
+        scraper.close()
 
 if __name__ == "__main__":
     main()
@@ -1,5 +1,3 @@
-def print_section(title):
-
 # OSINT Tool Starter - Advanced Workflow
 # Author: (your name)
 # Description: Modular, extensible OSINT tool for domains
@@ -7,7 +5,15 @@ def print_section(title):
 
 # All imports and code blocks are now properly indented and structured
 import argparse
-import socket
+import asyncio
+import gzip
+import hashlib
+import ipaddress
+import sys
+import threading
+import time
+import zlib
+import dns.asyncresolver
 import dns.resolver
 import dns.reversename
 import whois
@@ -15,10 +21,21 @@ import requests
 import ssl
 import json
 import os
-from datetime import datetime
+import random
+import sqlite3
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from requests.adapters import HTTPAdapter
 from rich.console import Console
 from rich.panel import Panel
 from rich.text import Text
+from rich.progress import Progress, BarColumn, MofNCompleteColumn, TimeElapsedColumn
+
+try:
+    import zstandard
+except ImportError:  # zstandard is optional; only needed for .zst output
+    zstandard = None
 
 # Initialize rich console for colorized output
 console = Console()
@@ -26,115 +43,808 @@ console = Console()
 # Output directory
 OUTPUT_DIR = "output"
 
+# DNS record types queried for every domain, all issued concurrently
+DNS_RECORD_TYPES = ["A", "AAAA", "MX", "TXT", "NS", "CNAME"]
+
+# Nameserver pool for the DNS engine (None uses the system resolver config).
+# Queries rotate across the pool; set with --nameservers.
+NAMESERVERS = None
+DNS_PORT = 53
+DNS_TIMEOUT = 5
+
+# Cache lifetime for DNS answers that carry no TTL (e.g. NODATA), in seconds
+DNS_DEFAULT_TTL = 300
+
+# Persistent result cache keyed by (module, cache_key). Lifetimes are in seconds;
+# DNS modules use the record TTL and SSL lasts until shortly before cert expiry.
+CACHE_PATH = os.path.join(OUTPUT_DIR, "cache.sqlite")
+CACHE_MAX_BYTES = 64 * 1024 * 1024
+CACHE_TTLS = {
+    "WHOIS": 24 * 3600,
+    "Threat Intelligence": 6 * 3600,
+    "Shodan": 24 * 3600,
+}
+SSL_EXPIRY_MARGIN = 24 * 3600
+
+# TLS harvester: ports probed per address, handshake timeout and concurrent handshakes
+TLS_PORTS = [443]
+TLS_TIMEOUT = 5
+TLS_CONCURRENCY = 512
+
+# Threat-intel providers. Base URLs can point at a mock provider for testing;
+# rates are requests/second until the provider's limit headers say otherwise.
+ABUSEIPDB_URL = os.environ.get("ABUSEIPDB_URL", "https://api.abuseipdb.com/api/v2")
+ABUSEIPDB_API_KEY = os.environ.get("ABUSEIPDB_API_KEY", "demo")  # Replace 'demo' with your API key for production
+SHODAN_URL = os.environ.get("SHODAN_URL", "https://api.shodan.io")
+PROVIDER_RATES = {"AbuseIPDB": 2.0, "Shodan": 1.0}
+PROVIDER_TIMEOUT = 10
+PROVIDER_MAX_RETRIES = 4
+PROVIDER_POOL_SIZE = 16
+# Completed responses each provider keeps for coalescing; the least recently used are dropped
+PROVIDER_MEMO_SIZE = 4096
+
+# Maximum concurrent per-IP requests when a module fans out over a target's addresses
+IP_FANOUT = 4
+
+# Facts whose hostnames become new targets when --expand-depth is set
+EXPAND_FACTS = ("sans", "mx_hosts")
+
+# Batch mode: maximum concurrent lookups per module. Slow or rate-limited
+# services (WHOIS, AbuseIPDB, Shodan) get small limits; DNS and TLS can fan out.
+MODULE_CONCURRENCY = {
+    "WHOIS": 4,
+    "DNS Records": 32,
+    "Reverse DNS": 32,
+    "SSL Certificate": 32,
+    "Threat Intelligence": 2,
+    "Shodan": 1,
+}
+
 # Helper to print section headings
 def print_section(title):
     console.print(Panel(Text(title, style="bold cyan"), expand=False))
 
+# Registered lookup modules by results section, in the order they are scheduled when several are ready
+MODULES = {}
+
+# A lookup module runs against a Target once every fact it requires is known for that
+# target, then publishes the facts its provides extractors pull out of its result
+class OsintModule:
+    def __init__(self, name, title, func, requires, provides, options):
+        self.name = name
+        self.title = title
+        self.func = func
+        self.requires = requires
+        self.provides = provides
+        self.options = options
+
+    # Section heading and error handling shared by every module
+    def run(self, target, options):
+        print_section(self.title)
+        try:
+            return self.func(target, **{key: options.get(key) for key in self.options})
+        except Exception as e:
+            console.print(f"[red]{self.title} failed: {e}[/red]")
+            return {"error": str(e)}
+
+    def facts(self, result):
+        if "error" in result:
+            return {fact: [] for fact in self.provides}
+        return {fact: extract(result) or [] for fact, extract in self.provides.items()}
+
+# Register a lookup module. "domain" is always known; requires names other facts that must be
+# published first, provides maps each fact it publishes to an extractor over its result, and
+# options names keyword arguments taken from the run options (e.g. API keys).
+def osint_module(name, title, requires=("domain",), provides=None, options=()):
+    def register(func):
+        MODULES[name] = OsintModule(name, title, func, tuple(requires), dict(provides or {}), tuple(options))
+        return func
+    return register
+
+# Fail fast on a registry whose dependencies can never all be satisfied (missing producer or cycle)
+def check_modules():
+    known = {"domain"}
+    waiting = dict(MODULES)
+    while waiting:
+        ready = [name for name, module in waiting.items() if set(module.requires) <= known]
+        if not ready:
+            raise ValueError(f"Modules with unsatisfiable requirements: {', '.join(waiting)}")
+        for name in ready:
+            known.update(waiting.pop(name).provides)
+
+# Normalised hostnames from DNS names, SANs and the like: lowercase, no trailing dot or
+# wildcard label, IP addresses dropped
+def hostnames(values):
+    hosts = []
+    for value in values or []:
+        host = value.lower().rstrip(".").removeprefix("*.")
+        try:
+            ipaddress.ip_address(host)
+            continue
+        except ValueError:
+            pass
+        if host and host not in hosts:
+            hosts.append(host)
+    return hosts
+
 # WHOIS lookup
-def whois_lookup(domain):
-    print_section("WHOIS Lookup")
+@osint_module("WHOIS", "WHOIS Lookup")
+def whois_lookup(target):
     result = {}
+    w = whois.whois(target.domain)
+    for key, value in w.items():
+        console.print(f"[bold]{key}[/bold]: {value}")
+        result[key] = value
+    return result
+
+# Async resolver over the configured nameserver pool
+def make_resolver(nameservers=None):
+    if nameservers:
+        resolver = dns.asyncresolver.Resolver(configure=False)
+        resolver.nameservers = list(nameservers)
+        resolver.rotate = True
+    else:
+        resolver = dns.asyncresolver.Resolver()
+    resolver.port = DNS_PORT
+    resolver.lifetime = DNS_TIMEOUT
+    return resolver
+
+# One record type; failures are returned rather than raised so gather() never aborts.
+# The answer's TTL is appended to ttls when one is present.
+async def resolve_record(resolver, name, rtype, ttls):
     try:
-        w = whois.whois(domain)
-        for key, value in w.items():
-            console.print(f"[bold]{key}[/bold]: {value}")
-            result[key] = value
+        answers = await resolver.resolve(name, rtype, raise_on_no_answer=False)
+        if answers.rrset is not None:
+            ttls.append(answers.rrset.ttl)
+        return [str(rdata) for rdata in answers]
     except Exception as e:
-        console.print(f"[red]WHOIS lookup failed: {e}[/red]")
-    return result
+        return e
+
+# A/AAAA answers that resolved, in record order
+def answered_addresses(records):
+    return [ip for rtype in ("A", "AAAA") if isinstance(records.get(rtype), list) for ip in records[rtype]]
+
+# Every record type at once, then PTR for each A/AAAA answer without resolving the domain again
+async def dns_sweep_async(domain, nameservers=None):
+    resolver = make_resolver(nameservers)
+    ttls = []
+    answers = await asyncio.gather(*(resolve_record(resolver, domain, rtype, ttls) for rtype in DNS_RECORD_TYPES))
+    records = dict(zip(DNS_RECORD_TYPES, answers))
+    addresses = answered_addresses(records)
+    ptrs = await asyncio.gather(*(resolve_record(resolver, dns.reversename.from_address(ip), "PTR", ttls)
+                                  for ip in addresses))
+    return records, dict(zip(addresses, ptrs)), min(ttls, default=DNS_DEFAULT_TTL)
+
+# Per-run view of one domain: resolved once on first use, then shared by every module
+class Target:
+    def __init__(self, domain):
+        self.domain = domain
+        self.lock = threading.Lock()
+        self.sweep = None
+
+    def resolve(self):
+        with self.lock:
+            if self.sweep is None:
+                self.sweep = asyncio.run(dns_sweep_async(self.domain, NAMESERVERS))
+        return self.sweep
+
+    @property
+    def records(self):
+        return self.resolve()[0]
+
+    @property
+    def ptrs(self):
+        return self.resolve()[1]
+
+    # Shortest TTL across every answer in the sweep
+    @property
+    def ttl(self):
+        return self.resolve()[2]
+
+    # Every A and AAAA address, not only the first
+    @property
+    def addresses(self):
+        return answered_addresses(self.records)
+
+# Run fetch(ip) for every address of a target concurrently, keyed by IP
+def fan_out(target, fetch):
+    addresses = target.addresses
+    if not addresses:
+        raise ValueError(f"{target.domain} did not resolve to any address")
+    with ThreadPoolExecutor(max_workers=min(IP_FANOUT, len(addresses))) as pool:
+        return dict(zip(addresses, pool.map(fetch, addresses)))
 
 # DNS records
-def dns_lookup(domain):
-    print_section("DNS Records")
-    record_types = ["A", "AAAA", "MX", "TXT", "NS", "CNAME"]
+@osint_module("DNS Records", "DNS Records", provides={
+    "addresses": answered_addresses,
+    "mx_hosts": lambda result: hostnames(mx.split()[-1] for mx in result.get("MX") or []),
+    "ns_hosts": lambda result: hostnames(result.get("NS")),
+})
+def dns_lookup(target):
+    records = target.records
     results = {}
-    for rtype in record_types:
-        try:
-            answers = dns.resolver.resolve(domain, rtype, raise_on_no_answer=False)
-            records = [str(rdata) for rdata in answers]
-            console.print(f"[bold]{rtype}[/bold]: {records}")
-            results[rtype] = records
-        except Exception as e:
-            console.print(f"[yellow]{rtype} lookup failed: {e}[/yellow]")
+    for rtype, answer in records.items():
+        if isinstance(answer, Exception):
+            console.print(f"[yellow]{rtype} lookup failed: {answer}[/yellow]")
             results[rtype] = None
+        else:
+            console.print(f"[bold]{rtype}[/bold]: {answer}")
+            results[rtype] = answer
     return results
 
-# Reverse DNS lookup
-def reverse_dns_lookup(domain):
-    print_section("Reverse DNS Lookup")
-    result = {}
-    try:
-        ip = socket.gethostbyname(domain)
-        rev_name = dns.reversename.from_address(ip)
-        answers = dns.resolver.resolve(rev_name, "PTR")
-        ptrs = [str(rdata) for rdata in answers]
-        console.print(f"[bold]PTR[/bold]: {ptrs}")
-        result["PTR"] = ptrs
-    except Exception as e:
-        console.print(f"[red]Reverse DNS lookup failed: {e}[/red]")
-        result["PTR"] = None
+# Reverse DNS lookup, reusing the addresses from the DNS sweep
+@osint_module("Reverse DNS", "Reverse DNS Lookup", requires=("addresses",),
+              provides={"ptr_hosts": lambda result: hostnames(result.get("PTR"))})
+def reverse_dns_lookup(target):
+    if not target.addresses:
+        raise target.records["A"] if isinstance(target.records["A"], Exception) \
+            else ValueError(f"{target.domain} has no A or AAAA records")
+    result = {"Addresses": {}}
+    for ip, answer in target.ptrs.items():
+        if isinstance(answer, Exception):
+            console.print(f"[yellow]{ip}: PTR lookup failed: {answer}[/yellow]")
+            result["Addresses"][ip] = None
+        else:
+            console.print(f"[bold]PTR[/bold] {ip}: {answer}")
+            result["Addresses"][ip] = answer
+    result["PTR"] = [ptr for answer in result["Addresses"].values() if answer for ptr in answer]
     return result
 
-# SSL certificate details
-def ssl_certificate_details(domain):
-    print_section("SSL Certificate Details")
-    result = {}
-    try:
-        context = ssl.create_default_context()
-        with socket.create_connection((domain, 443), timeout=5) as sock:
-            with context.wrap_socket(sock, server_hostname=domain) as ssock:
-                cert = ssock.getpeercert()
-                console.print(cert)
-                result = cert
-    except Exception as e:
-        console.print(f"[yellow]SSL certificate not available or error: {e}[/yellow]")
+# Certificate time ("Nov 16 06:16:14 2026 GMT") as an ISO 8601 UTC timestamp
+def cert_time(value):
+    return datetime.fromtimestamp(ssl.cert_time_to_seconds(value), timezone.utc).isoformat()
+
+# Flatten a decoded subject/issuer into {"commonName": ..., "organizationName": ...}
+def cert_name(name):
+    return {key: value for rdn in name for key, value in rdn}
+
+# Compact record for one certificate in a chain
+def cert_record(info, der):
+    not_after = ssl.cert_time_to_seconds(info["notAfter"])
+    return {
+        "subject": cert_name(info.get("subject", ())),
+        "issuer": cert_name(info.get("issuer", ())),
+        "serial": info.get("serialNumber"),
+        "not_before": cert_time(info["notBefore"]),
+        "not_after": cert_time(info["notAfter"]),
+        "days_left": int((not_after - time.time()) // 86400),
+        "sans": [value for kind, value in info.get("subjectAltName", ())],
+        "self_signed": info.get("subject") == info.get("issuer"),
+        "sha256": hashlib.sha256(der).hexdigest(),
+    }
+
+# DNS-name match against a SAN list, allowing one wildcard in the leftmost label
+def hostname_matches(hostname, sans):
+    hostname = hostname.lower().rstrip(".")
+    for san in sans:
+        san = san.lower().rstrip(".")
+        if san == hostname:
+            return True
+        if san.startswith("*.") and hostname.count(".") == san.count(".") and hostname.endswith(san[1:]):
+            return True
+    return False
+
+# Every certificate the peer sent, leaf first. ssl only exposes the chain on the
+# underlying _ssl object before Python 3.13; fall back to the leaf alone.
+def peer_chain(ssl_object):
+    sslobj = getattr(ssl_object, "_sslobj", None)
+    if sslobj is not None and hasattr(sslobj, "get_unverified_chain"):
+        return [cert_record(cert.get_info(), cert.public_bytes(ssl._ssl.ENCODING_DER))
+                for cert in sslobj.get_unverified_chain() or []]
+    der = ssl_object.getpeercert(binary_form=True)
+    info = ssl_object.getpeercert()
+    return [cert_record(info, der)] if der and info else []
+
+# Certificates are harvested, not trusted: verification is off so self-signed
+# and mismatched endpoints are still recorded
+def harvest_context():
+    context = ssl.create_default_context()
+    context.check_hostname = False
+    context.verify_mode = ssl.CERT_NONE
+    return context
+
+# Handshake with one endpoint and record its protocol, cipher and certificate chain
+async def probe_tls(host, port, server_name, context, semaphore):
+    async with semaphore:
+        try:
+            _, writer = await asyncio.wait_for(
+                asyncio.open_connection(host, port, ssl=context, server_hostname=server_name),
+                TLS_TIMEOUT,
+            )
+        except Exception as e:
+            return {"error": str(e) or type(e).__name__}
+        try:
+            ssl_object = writer.get_extra_info("ssl_object")
+            chain = peer_chain(ssl_object)
+            return {
+                "tls_version": ssl_object.version(),
+                "cipher": ssl_object.cipher()[0],
+                "hostname_match": bool(chain) and hostname_matches(server_name, chain[0]["sans"]),
+                "chain": chain,
+            }
+        finally:
+            # Skip the close_notify exchange; nothing else is sent on this connection
+            writer.transport.abort()
+
+# Probe many (host, port, server_name) endpoints concurrently in one event loop
+async def harvest_tls(endpoints, concurrency=None):
+    context = harvest_context()
+    semaphore = asyncio.Semaphore(concurrency or TLS_CONCURRENCY)
+    probes = await asyncio.gather(*(probe_tls(host, port, name, context, semaphore) for host, port, name in endpoints))
+    return {endpoint_key(host, port): probe for (host, port, _), probe in zip(endpoints, probes)}
+
+def endpoint_key(host, port):
+    return f"[{host}]:{port}" if ":" in host else f"{host}:{port}"
+
+# Earliest leaf expiry across a harvest, as a Unix timestamp
+def earliest_expiry(result):
+    expiries = [datetime.fromisoformat(probe["chain"][0]["not_after"]).timestamp()
+                for probe in result.values() if isinstance(probe, dict) and probe.get("chain")]
+    return min(expiries, default=None)
+
+# Hostnames from the leaf SANs of every endpoint in a harvest
+def cert_sans(result):
+    return hostnames(san for probe in result.values() if isinstance(probe, dict) and probe.get("chain")
+                     for san in probe["chain"][0]["sans"])
+
+# SSL certificate details for every address and TLS port of the target, using the domain for SNI
+@osint_module("SSL Certificate", "SSL Certificate Details", requires=("addresses",), provides={"sans": cert_sans})
+def ssl_certificate_details(target):
+    hosts = target.addresses or [target.domain]
+    endpoints = [(host, port, target.domain) for host in hosts for port in TLS_PORTS]
+    result = asyncio.run(harvest_tls(endpoints))
+    for endpoint, probe in result.items():
+        if "error" in probe:
+            console.print(f"[yellow]{endpoint}: SSL certificate not available or error: {probe['error']}[/yellow]")
+            continue
+        leaf = probe["chain"][0] if probe["chain"] else {}
+        console.print(f"[bold]{endpoint}[/bold] {probe['tls_version']} {probe['cipher']}")
+        console.print(f"  Subject: {leaf.get('subject')}  Issuer: {leaf.get('issuer')}")
+        console.print(f"  SANs: {leaf.get('sans')}")
+        console.print(f"  Expires: {leaf.get('not_after')} ({leaf.get('days_left')} days)  "
+                      f"Chain length: {len(probe['chain'])}  Hostname match: {probe['hostname_match']}")
     return result
 
-# Threat intelligence blacklist check (using AbuseIPDB public API as example)
-def threat_intel_blacklist(domain):
-    print_section("Threat Intelligence Blacklist Check")
-    result = {}
+# Harvest certificates for many domains in a single event loop, saving one result file per
+# domain or one record per domain to the JSONL sink
+def run_tls_sweep(domains, concurrency=None, sink=None):
+    if sink is not None:
+        domains = [domain for domain in domains if (domain, "SSL Certificate") not in sink.done]
+    endpoints = [(domain, port, domain) for domain in domains for port in TLS_PORTS]
+    started = time.monotonic()
+    harvest = asyncio.run(harvest_tls(endpoints, concurrency))
+    for domain in domains:
+        result = {key: harvest[key] for key in (endpoint_key(domain, port) for port in TLS_PORTS)}
+        if sink is not None:
+            sink.write(domain, "SSL Certificate", result)
+        else:
+            save_results(domain, {"SSL Certificate": result})
+    failed = sum("error" in probe for probe in harvest.values())
+    console.print(f"[green]TLS sweep complete: {len(endpoints)} endpoints in {time.monotonic() - started:.1f}s, "
+                  f"{failed} failed[/green]")
+
+# Token bucket; rate may be changed at any time and pause_until() blocks callers until a reset time
+class RateLimiter:
+    def __init__(self, rate):
+        self.rate = rate
+        self.tokens = max(1, rate or 0)
+        self.updated = time.monotonic()
+        self.paused_until = 0
+        self.lock = threading.Lock()
+
+    def pause_until(self, deadline):
+        with self.lock:
+            self.paused_until = max(self.paused_until, deadline)
+            self.tokens = 0
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    wait = self.paused_until - now
+                elif not self.rate:
+                    return
+                else:
+                    self.tokens = min(max(1, self.rate), self.tokens + (now - self.updated) * self.rate)
+                    self.updated = now
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+class ProviderError(Exception):
+    def __init__(self, provider, status):
+        super().__init__(f"{provider} API error: {status}")
+        self.status = status
+
+# Shared client for one API provider: pooled keep-alive session, rate limit steered by the
+# provider's X-RateLimit headers, 429 backoff, and coalescing of identical requests so
+# domains sharing an IP cost a single call per run (up to PROVIDER_MEMO_SIZE remembered responses)
+class ProviderClient:
+    def __init__(self, name, base_url, rate):
+        self.name = name
+        self.base_url = base_url.rstrip("/")
+        self.max_rate = rate
+        self.limiter = RateLimiter(rate)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=PROVIDER_POOL_SIZE)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.lock = threading.Lock()
+        self.calls = OrderedDict()
+
+    def get(self, path, params=None, headers=None):
+        key = (path, tuple(sorted((params or {}).items())))
+        with self.lock:
+            future = self.calls.get(key)
+            owner = future is None
+            if owner:
+                future = self.calls[key] = Future()
+                while len(self.calls) > PROVIDER_MEMO_SIZE:
+                    self.calls.popitem(last=False)
+            else:
+                self.calls.move_to_end(key)
+        if owner:
+            try:
+                future.set_result(self.fetch(path, params, headers))
+            except Exception as e:
+                # Failures are shared with concurrent waiters but not remembered
+                with self.lock:
+                    if self.calls.get(key) is future:
+                        del self.calls[key]
+                future.set_exception(e)
+        return future.result()
+
+    # Drop remembered responses once a run is over; waiters keep their own futures
+    def forget(self):
+        with self.lock:
+            self.calls.clear()
+
+    def fetch(self, path, params, headers):
+        for attempt in range(PROVIDER_MAX_RETRIES + 1):
+            self.limiter.acquire()
+            response = self.session.get(f"{self.base_url}{path}", params=params, headers=headers,
+                                        timeout=PROVIDER_TIMEOUT)
+            self.observe(response)
+            if response.status_code == 429 and attempt < PROVIDER_MAX_RETRIES:
+                delay = header_seconds(response.headers.get("Retry-After"))
+                if delay is None:
+                    delay = min(60, 2 ** attempt) + random.uniform(0, 1)
+                self.limiter.pause_until(time.monotonic() + delay)
+                continue
+            if response.status_code != 200:
+                raise ProviderError(self.name, response.status_code)
+            return response.json()
+
+    # Spread the remaining quota over the time left in the window, or stop until it resets
+    def observe(self, response):
+        remaining = response.headers.get("X-RateLimit-Remaining")
+        window = header_seconds(response.headers.get("X-RateLimit-Reset"))
+        if remaining is None or window is None:
+            return
+        try:
+            remaining = int(remaining)
+        except ValueError:
+            return
+        if remaining <= 0:
+            self.limiter.pause_until(time.monotonic() + window)
+        else:
+            self.limiter.rate = min(self.max_rate, remaining / max(window, 1))
+
+# Seconds from a Retry-After or X-RateLimit-Reset header, which may be a delay or a Unix time
+def header_seconds(value):
     try:
-        ip = socket.gethostbyname(domain)
-        # AbuseIPDB public API (demo, limited)
-        url = f"https://api.abuseipdb.com/api/v2/check"
-        headers = {"Key": "demo"}  # Replace 'demo' with your API key for production
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, value - time.time()) if value > 1e9 else value
+
+abuseipdb = ProviderClient("AbuseIPDB", ABUSEIPDB_URL, PROVIDER_RATES["AbuseIPDB"])
+shodan = ProviderClient("Shodan", SHODAN_URL, PROVIDER_RATES["Shodan"])
+PROVIDERS = (abuseipdb, shodan)
+
+# Run fetch(ip) for every address, recording a provider error for that address instead of failing the lookup
+def fan_out_api(target, fetch):
+    def guarded(ip):
+        try:
+            return fetch(ip)
+        except (ProviderError, requests.RequestException) as e:
+            return {"error": str(e)}
+    return fan_out(target, guarded)
+
+# Threat intelligence blacklist check (using AbuseIPDB public API as example), one check per address
+@osint_module("Threat Intelligence", "Threat Intelligence Blacklist Check", requires=("addresses",))
+def threat_intel_blacklist(target):
+    def check(ip):
         params = {"ipAddress": ip, "maxAgeInDays": "90"}
-        response = requests.get(url, headers=headers, params=params)
-        if response.status_code == 200:
-            data = response.json()
-            console.print(data)
-            result = data
+        return abuseipdb.get("/check", params=params, headers={"Key": ABUSEIPDB_API_KEY, "Accept": "application/json"})
+
+    result = fan_out_api(target, check)
+    for ip, data in result.items():
+        if "error" in data:
+            console.print(f"[yellow]{ip}: {data['error']}[/yellow]")
         else:
-            console.print(f"[yellow]AbuseIPDB API error: {response.status_code}[/yellow]")
-    except Exception as e:
-        console.print(f"[red]Threat intelligence check failed: {e}[/red]")
+            console.print(f"[bold]{ip}[/bold]: {data}")
     return result
 
-# Shodan query (optional, requires API key)
-def shodan_query(domain, shodan_api_key=None):
-    print_section("Shodan Query")
-    result = {}
+# Shodan query (optional, requires API key), one host lookup per address
+@osint_module("Shodan", "Shodan Query", requires=("addresses",), options=("shodan_api_key",))
+def shodan_query(target, shodan_api_key=None):
     if not shodan_api_key:
         console.print("[yellow]No Shodan API key provided. Skipping.[/yellow]")
-        return result
-    try:
-        ip = socket.gethostbyname(domain)
-        url = f"https://api.shodan.io/shodan/host/{ip}?key={shodan_api_key}"
-        response = requests.get(url)
-        if response.status_code == 200:
-            data = response.json()
-            open_ports = data.get("ports", [])
-            banners = [item.get("data", "") for item in data.get("data", [])]
-            console.print(f"[bold]Open Ports:[/bold] {open_ports}")
-            console.print(f"[bold]Banners:[/bold] {banners}")
-            result = data
-        else:
-            console.print(f"[yellow]Shodan API error: {response.status_code}[/yellow]")
-    except Exception as e:
-        console.print(f"[red]Shodan query failed: {e}[/red]")
+        return {}
+
+    def host(ip):
+        return shodan.get(f"/shodan/host/{ip}", params={"key": shodan_api_key})
+
+    result = fan_out_api(target, host)
+    for ip, data in result.items():
+        if "error" in data:
+            console.print(f"[yellow]{ip}: {data['error']}[/yellow]")
+            continue
+        open_ports = data.get("ports", [])
+        banners = [item.get("data", "") for item in data.get("data", [])]
+        console.print(f"[bold]{ip} Open Ports:[/bold] {open_ports}")
+        console.print(f"[bold]{ip} Banners:[/bold] {banners}")
     return result
 
+# True when a lookup failed in a way worth retrying (timeout, SERVFAIL, refused). NXDOMAIN is an
+# answer, and NODATA comes back as an empty list rather than an exception.
+def dns_failed(answers):
+    return any(isinstance(answer, Exception) and not isinstance(answer, dns.resolver.NXDOMAIN)
+               for answer in answers)
+
+# Seconds a module result stays fresh, or None when it should not be cached
+def cache_ttl(name, target, result):
+    if not result or "error" in result or any(isinstance(v, dict) and "error" in v for v in result.values()):
+        return None
+    if name == "DNS Records" and dns_failed(target.records.values()):
+        return None
+    if name == "Reverse DNS" and dns_failed(target.ptrs.values()):
+        return None
+    if name in ("DNS Records", "Reverse DNS"):
+        return target.ttl
+    if name == "SSL Certificate":
+        expiry = earliest_expiry(result)
+        return expiry - SSL_EXPIRY_MARGIN - time.time() if expiry else None
+    return CACHE_TTLS.get(name)
+
+# Persistent SQLite cache of module results with per-entry expiry and LRU size eviction
+class ResultCache:
+    def __init__(self, path=CACHE_PATH, max_bytes=CACHE_MAX_BYTES):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "module TEXT, target TEXT, value TEXT, size INTEGER, expires_at REAL, last_used REAL, "
+            "PRIMARY KEY (module, target))"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_results_last_used ON results (last_used)")
+        self.conn.commit()
+
+    def get(self, module, target):
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT value, expires_at FROM results WHERE module = ? AND target = ?", (module, target)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] <= now:
+                self.conn.execute("DELETE FROM results WHERE module = ? AND target = ?", (module, target))
+                self.conn.commit()
+                return None
+            self.conn.execute(
+                "UPDATE results SET last_used = ? WHERE module = ? AND target = ?", (now, module, target)
+            )
+            self.conn.commit()
+        return json.loads(row[0])
+
+    def put(self, module, target, value, ttl):
+        value = json.dumps(value, default=str)
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)",
+                (module, target, value, len(value), now + ttl, now),
+            )
+            self.evict()
+            self.conn.commit()
+
+    # Drop expired entries, then least recently used ones until the cache fits max_bytes
+    def evict(self):
+        self.conn.execute("DELETE FROM results WHERE expires_at <= ?", (time.time(),))
+        excess = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0] - self.max_bytes
+        if excess <= 0:
+            return
+        freed = 0
+        victims = []
+        for module, target, size in self.conn.execute("SELECT module, target, size FROM results ORDER BY last_used"):
+            victims.append((module, target))
+            freed += size
+            if freed >= excess:
+                break
+        self.conn.executemany("DELETE FROM results WHERE module = ? AND target = ?", victims)
+
+    def close(self):
+        self.conn.close()
+
+# Cache key for a module result: the domain plus any settings that shape the result, so a run
+# against other nameservers or TLS ports never reads another configuration's entries
+def cache_key(name, domain):
+    key = [domain]
+    if name in ("DNS Records", "Reverse DNS", "SSL Certificate"):
+        key.append(f"ns={','.join(NAMESERVERS or ['system'])}:{DNS_PORT}")
+    if name == "SSL Certificate":
+        key.append(f"tls={','.join(str(port) for port in TLS_PORTS)}")
+    return "|".join(key)
+
+# Run one module through the cache: fresh entries are returned without touching the network,
+# and --refresh skips the read but still stores the new result
+def cached_lookup(cache, name, lookup, target, refresh=False):
+    key = cache_key(name, target.domain)
+    if cache is not None and not refresh:
+        result = cache.get(name, key)
+        if result is not None:
+            print_section(name)
+            console.print("[dim](cached)[/dim]")
+            console.print(result)
+            return result
+    result = lookup(target)
+    if cache is not None:
+        ttl = cache_ttl(name, target, result)
+        if ttl and ttl > 0:
+            cache.put(name, key, result, ttl)
+    return result
+
+# Read one domain per line from a file or stdin ("-"), skipping blanks, comments and repeats
+def read_domains(path):
+    handle = sys.stdin if path == "-" else open(path)
+    try:
+        # dict keeps first-seen order with O(1) membership, for inputs of thousands of domains
+        domains = dict.fromkeys(line.split("#", 1)[0].strip().lower() for line in handle)
+        domains.pop("", None)
+        return list(domains)
+    finally:
+        if handle is not sys.stdin:
+            handle.close()
+
+# Modules to run for a domain: those not yet recorded, plus any producer whose facts they need
+def modules_to_run(domain, done):
+    needed = {name for name in MODULES if (domain, name) not in done}
+    changed = True
+    while changed:
+        changed = False
+        for name, module in MODULES.items():
+            if name not in needed and any(fact in module.provides for other in needed
+                                          for fact in MODULES[other].requires):
+                needed.add(name)
+                changed = True
+    return needed
+
+# One domain in a sweep: its shared Target, the facts published so far and its unfinished modules
+class SweepState:
+    def __init__(self, domain, depth, parent, waiting, record):
+        self.target = Target(domain)
+        self.depth = depth
+        self.parent = parent
+        self.facts = {"domain": [domain]}
+        self.waiting = waiting
+        self.record = record
+        self.running = 0
+        self.results = {}
+
+# Run every registered module for every domain as a dependency DAG: modules start as soon as the
+# facts they require are published, so independent ones (WHOIS, DNS) overlap while dependents wait.
+# Hostnames in EXPAND_FACTS become new targets up to max_depth hops away and at most budget of them.
+# Each domain is saved (or streamed to the sink) as soon as its last module finishes.
+def run_sweep(domains, options=None, workers=32, rate=None, cache=None, refresh=False, sink=None,
+              max_depth=0, budget=0):
+    options = options or {}
+    check_modules()
+    limits = {name: threading.BoundedSemaphore(MODULE_CONCURRENCY.get(name, 4)) for name in MODULES}
+    limiter = RateLimiter(rate)
+    done = sink.done if sink is not None else set()
+    seen = set(domains)
+    states = {}
+    futures = {}
+    derived = 0
+    failures = 0
+    added = 0
+
+    # Cache hits skip the module limit and the rate limiter
+    def run_module(module, target):
+        def limited(target):
+            with limits[module.name]:
+                limiter.acquire()
+                return module.run(target, options)
+        return cached_lookup(cache, module.name, limited, target, refresh)
+
+    def add_target(domain, depth=0, parent=None):
+        nonlocal added
+        waiting = modules_to_run(domain, done)
+        if not waiting:
+            return False
+        record = {name for name in waiting if (domain, name) not in done}
+        states[domain] = SweepState(domain, depth, parent, [name for name in MODULES if name in waiting], record)
+        added += 1
+        progress.update(task, total=added)
+        schedule(states[domain])
+        return True
+
+    def schedule(state):
+        for name in list(state.waiting):
+            module = MODULES[name]
+            if all(fact in state.facts for fact in module.requires):
+                state.waiting.remove(name)
+                state.running += 1
+                futures[pool.submit(run_module, module, state.target)] = (state, module)
+
+    def expand(state, module):
+        nonlocal derived
+        if state.depth >= max_depth:
+            return
+        for fact in EXPAND_FACTS:
+            for host in state.facts.get(fact, []) if fact in module.provides else []:
+                if host in seen:
+                    continue
+                if derived >= budget:
+                    return
+                seen.add(host)
+                if add_target(host, state.depth + 1, state.target.domain):
+                    derived += 1
+
+    def finish(state):
+        if sink is None:
+            save_results(state.target.domain, state.results)
+        del states[state.target.domain]
+        progress.advance(task)
+
+    # Per-domain section output would interleave across workers, so only the progress bar is shown
+    show_progress = workers > 1
+    console.quiet = show_progress
+    try:
+        with Progress("[progress.description]{task.description}", BarColumn(), MofNCompleteColumn(),
+                      TimeElapsedColumn(), console=Console(stderr=True), disable=not show_progress) as progress, \
+                ThreadPoolExecutor(max_workers=workers) as pool:
+            task = progress.add_task("Sweeping domains", total=0)
+            for domain in domains:
+                add_target(domain)
+            while futures:
+                finished, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    state, module = futures.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        result = {"error": str(e)}
+                    if "error" in result:
+                        failures += 1
+                    if module.name in state.record:
+                        if sink is not None:
+                            sink.write(state.target.domain, module.name, result, state.depth, state.parent)
+                        else:
+                            state.results[module.name] = result
+                    state.facts.update(module.facts(result))
+                    state.running -= 1
+                    expand(state, module)
+                    schedule(state)
+                    if not state.running and not state.waiting:
+                        finish(state)
+    finally:
+        # Unmute even when interrupted, or main() would swallow everything printed afterwards
+        console.quiet = False
+        for provider in PROVIDERS:
+            provider.forget()
+    console.print(f"[green]Sweep complete: {len(domains)} domains, {derived} discovered, "
+                  f"{failures} failed lookups[/green]")
+
 # Save results to timestamped JSON and text files
 def save_results(domain, results):
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -143,7 +853,7 @@ def save_results(domain, results):
     txt_path = os.path.join(OUTPUT_DIR, f"{domain}_{timestamp}.txt")
     # Save JSON
     with open(json_path, "w") as f:
-        json.dump(results, f, indent=2)
+        json.dump(results, f, indent=2, default=str)
     # Save text
     with open(txt_path, "w") as f:
         for section, data in results.items():
@@ -151,71 +861,178 @@ def save_results(domain, results):
             f.write(str(data) + "\n\n")
     console.print(f"[green]Results saved to {json_path} and {txt_path}[/green]")
 
+# Open a JSONL file, compressed according to its extension (.gz or .zst)
+def open_jsonl(path, mode):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode)
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError("zstandard is required for .zst output (pip install zstandard)")
+        handle = open(path, mode)
+        if "r" in mode:
+            return zstandard.ZstdDecompressor().stream_reader(handle, read_across_frames=True, closefd=True)
+        return zstandard.ZstdCompressor().stream_writer(handle, closefd=True)
+    return open(path, mode)
+
+JSONL_READ_ERRORS = (EOFError, OSError, ValueError, zlib.error) + ((zstandard.ZstdError,) if zstandard else ())
+
+# Decompressed chunks of a JSONL file. gzip members and zstd frames are decoded incrementally
+# so that everything before a truncated one is still returned before EOFError is raised
+# (zstd's stream_reader would otherwise end quietly at a torn frame).
+def iter_jsonl_chunks(path):
+    if path.endswith(".gz"):
+        new_decompressor = lambda: zlib.decompressobj(zlib.MAX_WBITS | 16)
+    elif path.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError("zstandard is required for .zst output (pip install zstandard)")
+        new_decompressor = lambda: zstandard.ZstdDecompressor().decompressobj()
+    else:
+        with open_jsonl(path, "rb") as handle:
+            while chunk := handle.read(1 << 16):
+                yield chunk
+        return
+    with open(path, "rb") as handle:
+        decompressor = new_decompressor()
+        pending = False
+        while chunk := handle.read(1 << 16):
+            while chunk:
+                pending = True
+                yield decompressor.decompress(chunk)
+                chunk = b""
+                if decompressor.eof:
+                    chunk = decompressor.unused_data
+                    decompressor = new_decompressor()
+                    pending = False
+        if pending:
+            yield decompressor.flush()
+            raise EOFError("compressed stream ended before the end-of-stream marker")
+
+# Complete JSON records in a JSONL file; the second value is False if the file ends in a
+# partial line or a truncated compressed stream (e.g. after a crash)
+def read_jsonl(path):
+    records = []
+    buffer = b""
+    try:
+        for chunk in iter_jsonl_chunks(path):
+            *lines, buffer = (buffer + chunk).split(b"\n")
+            records.extend(json.loads(line) for line in lines if line.strip())
+    except JSONL_READ_ERRORS:
+        return records, False
+    return records, not buffer.strip()
+
+# Streams one compact JSON record per (domain, module) as lookups complete. Output is
+# plain, gzip or zstd JSONL, so pandas.read_json(lines=True) or DuckDB's read_json_auto
+# can query a whole sweep as one file. With resume, earlier records are kept and
+# (domain, module) pairs already recorded successfully are listed in done; failed lookups
+# ({"error": ...}) are retried and their new record is appended, so readers take the last one.
+class JsonlSink:
+    def __init__(self, path, resume=False):
+        self.path = path
+        self.done = set()
+        self.lock = threading.Lock()
+        if resume and os.path.exists(path):
+            records, clean = read_jsonl(path)
+            self.done = {(record["domain"], record["module"]) for record in records
+                         if not self.failed(record["result"])}
+            if not clean:
+                # Appending after a torn write would corrupt the stream, so keep only whole records
+                self.rewrite(records)
+            self.handle = open_jsonl(path, "ab")
+        else:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self.handle = open_jsonl(path, "wb")
+
+    def rewrite(self, records):
+        tmp_path = self.path + ".tmp" + os.path.splitext(self.path)[1]
+        with open_jsonl(tmp_path, "wb") as handle:
+            for record in records:
+                handle.write(self.encode(record))
+        os.replace(tmp_path, self.path)
+
+    @staticmethod
+    def failed(result):
+        return isinstance(result, dict) and "error" in result
+
+    @staticmethod
+    def encode(record):
+        return (json.dumps(record, default=str, separators=(",", ":")) + "\n").encode()
+
+    def write(self, domain, module, result, depth=0, parent=None):
+        record = {
+            "domain": domain,
+            "module": module,
+            "depth": depth,
+            "parent": parent,
+            "completed_at": datetime.now(timezone.utc).isoformat(),
+            "result": result,
+        }
+        line = self.encode(record)
+        with self.lock:
+            self.handle.write(line)
+            # Flush each record through the compressor so a crash loses at most the current line
+            if zstandard is not None and isinstance(self.handle, zstandard.ZstdCompressionWriter):
+                self.handle.flush(zstandard.FLUSH_BLOCK)
+            else:
+                self.handle.flush()
+            if not self.failed(result):
+                self.done.add((domain, module))
+
+    def close(self):
+        self.handle.close()
+
 # Main workflow
 def main():
     parser = argparse.ArgumentParser(description="Advanced Python OSINT Tool Starter")
-    parser.add_argument("domain", help="Domain name to query")
+    parser.add_argument("domain", nargs="?", help="Domain name to query")
     parser.add_argument("--shodan", help="Shodan API key (optional)", default=None)
+    parser.add_argument("--batch", metavar="FILE", help="Query every domain in FILE (one per line, '-' for stdin)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Concurrent lookups (default: 32 in batch mode, 1 for a single domain so output stays readable)")
+    parser.add_argument("--rate", type=float, default=None, help="Maximum lookups per second across all modules in batch mode")
+    parser.add_argument("--nameservers", help="Comma-separated nameserver pool for DNS queries (default: system resolver)")
+    parser.add_argument("--dns-port", type=int, default=53, help="Port the nameservers listen on (default: 53)")
+    parser.add_argument("--tls-ports", help="Comma-separated ports to harvest TLS certificates from (default: 443)")
+    parser.add_argument("--tls-only", action="store_true", help="With --batch, only harvest TLS certificates, in a single event loop")
+    parser.add_argument("--jsonl", metavar="PATH", help="Stream one JSON record per domain and module to PATH "
+                        "(.gz or .zst for compression) instead of per-domain files")
+    parser.add_argument("--resume", action="store_true", help="With --jsonl, keep PATH and skip lookups it already records")
+    parser.add_argument("--refresh", action="store_true", help="Ignore cached results and query every module again")
+    parser.add_argument("--no-cache", action="store_true", help="Neither read nor write the result cache")
+    parser.add_argument("--expand-depth", type=int, default=0,
+                        help="Also query hostnames found in certificate SANs and MX records, up to this many hops (default: 0)")
+    parser.add_argument("--expand-budget", type=int, default=100,
+                        help="Maximum number of discovered hostnames to query (default: 100)")
     args = parser.parse_args()
 
-    domain = args.domain
-    shodan_api_key = args.shodan
+    global NAMESERVERS, DNS_PORT, TLS_PORTS
+    if args.nameservers:
+        NAMESERVERS = [ns.strip() for ns in args.nameservers.split(",") if ns.strip()]
+    DNS_PORT = args.dns_port
+    if args.tls_ports:
+        TLS_PORTS = [int(port) for port in args.tls_ports.split(",") if port.strip()]
 
-    results = {}
-    results["WHOIS"] = whois_lookup(domain)
-    results["DNS Records"] = dns_lookup(domain)
-    results["Reverse DNS"] = reverse_dns_lookup(domain)
-    results["SSL Certificate"] = ssl_certificate_details(domain)
-    results["Threat Intelligence"] = threat_intel_blacklist(domain)
-    results["Shodan"] = shodan_query(domain, shodan_api_key)
+    if not args.batch and not args.domain:
+        parser.error("a domain or --batch FILE is required")
+    if args.resume and not args.jsonl:
+        parser.error("--resume requires --jsonl")
+    cache = None if args.no_cache else ResultCache()
+    sink = JsonlSink(args.jsonl, resume=args.resume) if args.jsonl else None
 
-    save_results(domain, results)
+    try:
+        domains = read_domains(args.batch) if args.batch else [args.domain.lower()]
+        if args.batch and args.tls_only:
+            run_tls_sweep(domains, sink=sink)
+            return
+        workers = args.workers or (32 if args.batch else 1)
+        run_sweep(domains, {"shodan_api_key": args.shodan}, workers=workers, rate=args.rate, cache=cache,
+                  refresh=args.refresh, sink=sink, max_depth=args.expand_depth, budget=args.expand_budget)
+    finally:
+        if cache is not None:
+            cache.close()
+        if sink is not None:
+            sink.close()
+            console.print(f"[green]Results streamed to {args.jsonl}[/green]")
 
 # Entry point
 if __name__ == "__main__":
     main()
-
-# WHOIS lookup
-def whois_lookup(domain):
-    print_section("WHOIS Lookup")
-    try:
-        w = whois.whois(domain)
-        for key, value in w.items():
-            print(f"{key}: {value}")
-    except Exception as e:
-        print(f"WHOIS lookup failed: {e}")
-
-# DNS records
-def dns_lookup(domain):
-    print_section("DNS Records")
-    record_types = ["A", "AAAA", "MX", "TXT", "NS", "CNAME"]
-    for rtype in record_types:
-        try:
-            answers = dns.resolver.resolve(domain, rtype, raise_on_no_answer=False)
-            print(f"{rtype}:")
-            for rdata in answers:
-                print(f"  {rdata}")
-        except Exception as e:
-            print(f"  {rtype} lookup failed: {e}")
-
-# Reverse DNS lookup
-def reverse_dns_lookup(domain):
-    print_section("Reverse DNS Lookup")
-    try:
-        ip = socket.gethostbyname(domain)
-        rev_name = dns.reversename.from_address(ip)
-        answers = dns.resolver.resolve(rev_name, "PTR")
-        for rdata in answers:
-            print(f"PTR: {rdata}")
-    except Exception as e:
-        print(f"Reverse DNS lookup failed: {e}")
-
-if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description="Python OSINT Tool Starter")
-    parser.add_argument("domain", help="Domain name to query")
-    args = parser.parse_args()
-
-    domain = args.domain
-    whois_lookup(domain)
-    dns_lookup(domain)
-    reverse_dns_lookup(domain)
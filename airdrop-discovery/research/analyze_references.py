@@ -25,6 +25,15 @@ REFERENCE_URLS = [
     # Add more public reference URLs here
 ]
 
+# BeautifulSoup tree builder for UI analysis. lxml builds the DOM in C and is
+# several times faster and lighter than html5lib; html5lib is only used when
+# lxml is not installed.
+try:
+    import lxml  # noqa: F401
+    PARSER_BACKEND = "lxml"
+except ImportError:
+    PARSER_BACKEND = "html5lib"
+
 class AirdropAnalyzer:
     def __init__(self):
         self.session = None
@@ -80,7 +89,7 @@ class AirdropAnalyzer:
 
     def extract_ui_patterns(self, html: str, url: str) -> Dict[str, Any]:
         """Extract UI patterns from HTML"""
-        soup = BeautifulSoup(html, 'html5lib')
+        soup = BeautifulSoup(html, PARSER_BACKEND)
         patterns = {
             "source_url": url,
             "hero_section": self._analyze_hero(soup),
@@ -0,0 +1,242 @@
+"""Shared fixtures for the script tests.
+
+The scripts are not packages (and their file names contain spaces), so they
+are loaded from their paths. Both write state files relative to the working
+directory, so every test runs from its own temporary directory.
+"""
+
+import importlib.util
+import os
+import shutil
+import socket
+import socketserver
+import ssl
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+FIXTURES = Path(__file__).resolve().parent / 'fixtures'
+
+SCRAPER_PATH = ROOT / 'Farcaster Invite Code scraper.py'
+OSINT_PATH = ROOT / 'OSINT Tool Starter' / 'osint_tool.py'
+ANALYZER_PATH = ROOT / 'airdrop-discovery' / 'research' / 'analyze_references.py'
+
+
+def load_script(name: str, path: Path):
+    """Import a standalone script as a module registered under `name`."""
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+class FailingWrites:
+    """sqlite3 connection stand-in whose writes fail but whose reads work."""
+
+    def __init__(self, conn, fail):
+        self._conn = conn
+        self._fail = fail
+
+    def execute(self, sql, *args):
+        if sql.lstrip().upper().startswith('SELECT'):
+            return self._conn.execute(sql, *args)
+        return self._fail()
+
+    def executemany(self, *args):
+        return self._fail()
+
+    def __enter__(self):
+        return self._conn.__enter__()
+
+    def __exit__(self, *exc):
+        return self._conn.__exit__(*exc)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+class StubDNSServer:
+    """UDP DNS server on loopback answering from an in-memory zone.
+
+    `zone` maps names (with trailing dot) to {rtype: [rdata text]}. Names not in
+    the zone get NXDOMAIN, names in `servfail` get SERVFAIL and names in `drop`
+    get no reply at all. Every answer waits `delay` seconds, on its own thread,
+    so concurrent queries overlap.
+    """
+
+    def __init__(self, zone, host='127.0.0.1', port=0, delay=0.0, ttl=60, servfail=(), drop=()):
+        import dns.message
+        import dns.rcode
+        import dns.rdatatype
+        import dns.rrset
+        self._dns = (dns.message, dns.rcode, dns.rdatatype, dns.rrset)
+        self.zone = zone
+        self.delay = delay
+        self.ttl = ttl
+        self.servfail = set(servfail)
+        self.drop = set(drop)
+        self.queries = Counter()
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind((host, port))
+        self.sock.settimeout(0.05)
+        self.port = self.sock.getsockname()[1]
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+        self.thread.start()
+
+    def _serve(self):
+        while not self.stopped.is_set():
+            try:
+                data, addr = self.sock.recvfrom(4096)
+            except socket.timeout:
+                continue
+            threading.Thread(target=self._answer, args=(data, addr), daemon=True).start()
+
+    def _answer(self, data, addr):
+        message, rcode, rdatatype, rrset = self._dns
+        query = message.from_wire(data)
+        question = query.question[0]
+        name = question.name.to_text()
+        rtype = rdatatype.to_text(question.rdtype)
+        self.queries[(name, rtype)] += 1
+        if name in self.drop:
+            return
+        time.sleep(self.delay)
+        response = message.make_response(query)
+        if name in self.servfail:
+            response.set_rcode(rcode.SERVFAIL)
+        elif name not in self.zone:
+            response.set_rcode(rcode.NXDOMAIN)
+        elif self.zone[name].get(rtype):
+            response.answer.append(rrset.from_text_list(question.name, self.ttl, 'IN', rtype, self.zone[name][rtype]))
+        try:
+            self.sock.sendto(response.to_wire(), addr)
+        except OSError:
+            pass
+
+    def close(self):
+        self.stopped.set()
+        self.thread.join()
+        self.sock.close()
+
+
+class _TLSHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        try:
+            self.request.do_handshake()
+            self.request.recv(1)
+        except (ssl.SSLError, OSError):
+            pass
+
+
+class LocalTLSServer(socketserver.ThreadingTCPServer):
+    """TLS server on a random loopback port that completes the handshake and waits for the client to leave."""
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, certfile, keyfile):
+        self.context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        self.context.load_cert_chain(certfile, keyfile)
+        super().__init__(('127.0.0.1', 0), _TLSHandler)
+        self.port = self.server_address[1]
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+
+    def get_request(self):
+        sock, addr = super().get_request()
+        return self.context.wrap_socket(sock, server_side=True, do_handshake_on_connect=False), addr
+
+    def close(self):
+        self.shutdown()
+        self.server_close()
+        self.thread.join()
+
+
+@pytest.fixture(scope='session')
+def tls_cert(tmp_path_factory):
+    """Self-signed EC certificate for test.local and *.test.local, as (certfile, keyfile)."""
+    if shutil.which('openssl') is None:
+        pytest.skip('openssl is not installed')
+    directory = tmp_path_factory.mktemp('tls')
+    certfile, keyfile = directory / 'cert.pem', directory / 'key.pem'
+    subprocess.run(
+        ['openssl', 'req', '-x509', '-newkey', 'ec', '-pkeyopt', 'ec_paramgen_curve:prime256v1', '-nodes',
+         '-keyout', str(keyfile), '-out', str(certfile), '-days', '30', '-subj', '/CN=test.local',
+         '-addext', 'subjectAltName=DNS:test.local,DNS:*.test.local'],
+        check=True, capture_output=True,
+    )
+    return str(certfile), str(keyfile)
+
+
+@pytest.fixture
+def tls_server(tls_cert):
+    server = LocalTLSServer(*tls_cert)
+    yield server
+    server.close()
+
+
+@pytest.fixture(scope='session')
+def scraper_module(tmp_path_factory):
+    # The scraper opens its log file in the working directory at import time
+    cwd = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp('scraper'))
+    try:
+        return load_script('farcaster_scraper', SCRAPER_PATH)
+    finally:
+        os.chdir(cwd)
+
+
+@pytest.fixture
+def scraper(scraper_module, tmp_path, monkeypatch):
+    """The scraper module, run from an empty directory."""
+    monkeypatch.chdir(tmp_path)
+    return scraper_module
+
+
+@pytest.fixture(scope='session')
+def analyzer_module():
+    for requirement in ('aiohttp', 'robotexclusionrulesparser', 'yaml', 'tqdm'):
+        pytest.importorskip(requirement)
+    return load_script('analyze_references', ANALYZER_PATH)
+
+
+@pytest.fixture(scope='session')
+def osint_module():
+    pytest.importorskip('dns.asyncresolver')
+    pytest.importorskip('whois')
+    return load_script('osint_tool', OSINT_PATH)
+
+
+@pytest.fixture
+def osint(osint_module, tmp_path, monkeypatch):
+    """The OSINT tool module, run from an empty directory."""
+    monkeypatch.chdir(tmp_path)
+    return osint_module
+
+
+@pytest.fixture
+def invite_scraper(scraper):
+    """An InviteCodeScraper with fresh databases, closed after the test."""
+    instance = scraper.InviteCodeScraper()
+    yield instance
+    instance.close()
+
+
+@pytest.fixture
+def replay_scraper(scraper, monkeypatch):
+    """An InviteCodeScraper replaying the recorded sources in fixtures/replay."""
+    monkeypatch.setattr(scraper.Config, 'REPLAY_MODE', 'replay')
+    monkeypatch.setattr(scraper.Config, 'FIXTURES_DIR', str(FIXTURES / 'replay'))
+    instance = scraper.InviteCodeScraper()
+    yield instance
+    instance.close()
@@ -0,0 +1,126 @@
+"""PageCrawler scheduling against a local HTTP server."""
+
+import sqlite3
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from conftest import FailingWrites
+
+
+class PageServer:
+    """Serves /slow/<n> after a delay and /fast/<n> at once, tracking concurrency per path kind."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.active = {'slow': 0, 'fast': 0}
+        self.peak = {'slow': 0, 'fast': 0}
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                kind = self.path.split('/')[1]
+                with server.lock:
+                    server.active[kind] += 1
+                    server.peak[kind] = max(server.peak[kind], server.active[kind])
+                try:
+                    if kind == 'slow':
+                        time.sleep(server.delay)
+                    body = f'<p>{self.path}</p>'.encode()
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'text/html')
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                finally:
+                    with server.lock:
+                        server.active[kind] -= 1
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.port = self.httpd.server_address[1]
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def server():
+    server = PageServer(delay=0.3)
+    yield server
+    server.close()
+
+
+def test_dominant_host_does_not_block_other_hosts(scraper, server, monkeypatch):
+    monkeypatch.setattr(scraper.Config, 'WEB_MAX_CONCURRENCY', 4)
+    monkeypatch.setattr(scraper.Config, 'WEB_PER_HOST_CONCURRENCY', 1)
+    # 127.0.0.1 and localhost reach the same server but count as different hosts
+    slow = [f'http://127.0.0.1:{server.port}/slow/{n}' for n in range(6)]
+    fast = [f'http://localhost:{server.port}/fast/{n}' for n in range(3)]
+    crawler = scraper.PageCrawler()
+    try:
+        start = time.monotonic()
+        arrivals = {url: time.monotonic() - start for url, *_ in crawler.crawl(slow + fast)}
+    finally:
+        crawler.close()
+
+    assert set(arrivals) == set(slow + fast)
+    assert server.peak['slow'] == 1
+    # Fast pages are fetched while the slow host works through its queue one page at a time
+    assert max(arrivals[url] for url in fast) < min(arrivals[url] for url in slow[1:])
+
+
+def test_host_limit_is_shared_between_concurrent_crawls(scraper, server, monkeypatch):
+    monkeypatch.setattr(scraper.Config, 'WEB_MAX_CONCURRENCY', 4)
+    monkeypatch.setattr(scraper.Config, 'WEB_PER_HOST_CONCURRENCY', 1)
+    crawler = scraper.PageCrawler()
+    results = []
+
+    def crawl(batch: int):
+        urls = [f'http://127.0.0.1:{server.port}/slow/{batch}-{n}' for n in range(2)]
+        results.extend(url for url, *_ in crawler.crawl(urls))
+
+    try:
+        threads = [threading.Thread(target=crawl, args=(batch,)) for batch in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        crawler.close()
+
+    assert len(results) == 4
+    assert server.peak['slow'] == 1
+
+
+def test_page_is_only_cached_once_its_codes_are_stored(replay_scraper, monkeypatch):
+    keyword = 'Farcaster invite code'
+    cache = replay_scraper.crawler.cache
+
+    def locked(*args, **kwargs):
+        raise sqlite3.OperationalError('database is locked')
+
+    with monkeypatch.context() as patch:
+        patch.setattr(replay_scraper.db, 'conn', FailingWrites(replay_scraper.db.conn, locked))
+        replay_scraper.search_web_keyword(keyword)
+        replay_scraper.flush_found_codes()
+    crawled = [url for url in replay_scraper.fixtures.data['web'] if 'example.com' in url]
+    assert all(cache.get(url) is None for url in crawled)
+
+    # The pages were not recorded as seen, so they are parsed again rather than skipped
+    replay_scraper.search_web_keyword(keyword)
+    replay_scraper.flush_found_codes()
+    assert cache.stats['unchanged'] == 0
+    assert replay_scraper.db.count_codes() > 0
+    cached = [url for url in crawled if cache.get(url) is not None]
+    assert cached
+
+    replay_scraper.search_web_keyword(keyword)
+    assert cache.stats['unchanged'] == len(cached)
@@ -0,0 +1,86 @@
+"""Database schema migrations, connection pragmas and WAL readers."""
+
+import sqlite3
+import time
+
+import pytest
+
+# invite_codes as created before migrations existed (PRAGMA user_version 0)
+BASELINE_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS invite_codes (
+        code TEXT PRIMARY KEY,
+        source TEXT,
+        found_at TIMESTAMP,
+        url TEXT,
+        is_valid BOOLEAN DEFAULT NULL
+    )
+'''
+
+
+@pytest.fixture
+def database(scraper):
+    db = scraper.Database()
+    yield db
+    db.conn.close()
+
+
+def columns(conn, table):
+    return {row[1] for row in conn.execute(f'PRAGMA table_info({table})')}
+
+
+def test_baseline_database_upgrades_in_place(scraper):
+    conn = sqlite3.connect(scraper.Config.DB_PATH)
+    conn.execute(BASELINE_SCHEMA)
+    conn.execute("INSERT INTO invite_codes (code, source, found_at, url, is_valid) "
+                 "VALUES ('aB3dE9fG2h', 'Reddit', '2023-09-01 12:00:00', 'https://reddit.com/x', 1)")
+    conn.commit()
+    conn.close()
+
+    db = scraper.Database()
+    try:
+        assert db.schema_version() == len(scraper.Database.MIGRATIONS) == 5
+        assert 'checked_at' in columns(db.conn, 'invite_codes')
+        tables = {row[0] for row in db.conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        assert {'reddit_submissions', 'twitter_cursors'} <= tables
+        indexes = {row[0] for row in db.conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        assert {'idx_invite_codes_found_at', 'idx_invite_codes_source', 'idx_invite_codes_checked_at'} <= indexes
+        assert db.conn.execute('SELECT code, is_valid, checked_at FROM invite_codes').fetchall() == [
+            ('aB3dE9fG2h', 1, None)]
+    finally:
+        db.conn.close()
+
+    # Reopening an up-to-date database runs nothing again
+    db = scraper.Database()
+    try:
+        assert db.schema_version() == 5
+    finally:
+        db.conn.close()
+
+
+def test_writer_pragmas(database):
+    conn = database.conn
+    assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+    assert conn.execute('PRAGMA synchronous').fetchone()[0] == 1  # NORMAL
+    assert conn.execute('PRAGMA busy_timeout').fetchone()[0] == 5000
+    assert conn.execute('PRAGMA temp_store').fetchone()[0] == 2  # MEMORY
+
+
+def test_reader_is_not_blocked_by_an_open_write(scraper, database):
+    database.add_codes([('aB3dE9fG2h', 'Reddit', 'https://reddit.com/x')])
+    # Hold a write transaction open, as the scraper does mid-batch
+    database.conn.execute('BEGIN IMMEDIATE')
+    database.conn.execute("INSERT INTO invite_codes (code, source) VALUES ('Q7wErT5yU1', 'Twitter')")
+
+    reader = scraper.Database.open_reader()
+    try:
+        started = time.monotonic()
+        assert reader.execute('SELECT code FROM invite_codes').fetchall() == [('aB3dE9fG2h',)]
+        # Far below busy_timeout: the read did not wait for the writer
+        assert time.monotonic() - started < 1
+        with pytest.raises(sqlite3.OperationalError):
+            reader.execute("DELETE FROM invite_codes")
+
+        database.conn.commit()
+        assert reader.execute('SELECT COUNT(*) FROM invite_codes').fetchone()[0] == 2
+    finally:
+        reader.close()
@@ -0,0 +1,59 @@
+"""InviteCodeExtractor accuracy on a labelled corpus, and its throughput."""
+
+import json
+
+import pytest
+
+from conftest import FIXTURES
+
+CORPUS = json.loads((FIXTURES / 'extractor_corpus.json').read_text())
+
+# Floors for the labelled corpus; raise them when the extractor improves
+MIN_PRECISION = 0.9
+MIN_RECALL = 0.9
+
+
+def extract_all(extractor):
+    """Return (true positives, false positives, false negatives) over the corpus."""
+    true_pos = false_pos = false_neg = 0
+    for sample in CORPUS:
+        found = {candidate.code for candidate in extractor.rank(sample['text'], sample.get('context'))}
+        expected = set(sample['codes'])
+        true_pos += len(found & expected)
+        false_pos += len(found - expected)
+        false_neg += len(expected - found)
+    return true_pos, false_pos, false_neg
+
+
+def test_precision_and_recall(scraper):
+    true_pos, false_pos, false_neg = extract_all(scraper.InviteCodeExtractor())
+    precision = true_pos / (true_pos + false_pos)
+    recall = true_pos / (true_pos + false_neg)
+    assert precision >= MIN_PRECISION, f"precision {precision:.2f}"
+    assert recall >= MIN_RECALL, f"recall {recall:.2f}"
+
+
+@pytest.mark.parametrize('sample', [s for s in CORPUS if s.get('context')],
+                         ids=lambda sample: sample['text'][:30])
+def test_parent_context_anchors_replies(scraper, sample):
+    extractor = scraper.InviteCodeExtractor()
+    found = [candidate.code for candidate in extractor.rank(sample['text'], sample['context'])]
+    assert sorted(found) == sorted(sample['codes'])
+    # Without the parent the reply has no keyword to anchor on
+    assert extractor.rank(sample['text']) == []
+
+
+@pytest.mark.parametrize('word', ['WhatsApp', 'LinkedIn', 'JavaScript', 'MetaMask', 'OpenSea', 'CoinGecko'])
+def test_camelcase_names_are_not_codes(scraper, word):
+    found = scraper.InviteCodeExtractor().rank(f'Farcaster invite code giveaway, follow us on {word}')
+    assert found == []
+
+
+def test_rank_throughput(scraper, benchmark):
+    extractor = scraper.InviteCodeExtractor()
+    # Roughly 1 MB of mixed prose and code-bearing posts
+    text = '\n'.join(sample['text'] for sample in CORPUS)
+    blob = text * (1024 * 1024 // len(text) + 1)
+    candidates = benchmark(extractor.rank, blob)
+    benchmark.extra_info['mb_per_call'] = len(blob) / 1e6
+    assert candidates
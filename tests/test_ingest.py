@@ -0,0 +1,38 @@
+"""Batched code ingestion in InviteCodeScraper.flush_found_codes."""
+
+import sqlite3
+
+from conftest import FailingWrites
+
+
+def test_failed_write_keeps_batch_queued(scraper, invite_scraper, monkeypatch):
+    invite_scraper.process_found_code('aB3dE9fG2h', 'Reddit', 'https://example.com/1')
+    invite_scraper.process_found_code('Zq7Wx2Rt5y', 'Web', 'https://example.com/2')
+
+    def broken_transaction():
+        raise sqlite3.OperationalError('database is locked')
+
+    with monkeypatch.context() as patch:
+        patch.setattr(invite_scraper.db, 'conn', FailingWrites(invite_scraper.db.conn, broken_transaction))
+        assert invite_scraper.flush_found_codes() == []
+
+    # Nothing was committed, so nothing may be skipped as already seen
+    assert not invite_scraper.seen_codes.seen('aB3dE9fG2h')
+    assert [code for code, _, _ in invite_scraper.found_codes] == ['aB3dE9fG2h', 'Zq7Wx2Rt5y']
+
+    invite_scraper.process_found_code('Pm4Kc8Ln1v', 'Twitter', 'https://example.com/3')
+    new_codes = invite_scraper.flush_found_codes()
+    assert [code for code, _, _ in new_codes] == ['aB3dE9fG2h', 'Zq7Wx2Rt5y', 'Pm4Kc8Ln1v']
+    assert invite_scraper.db.count_codes() == 3
+    assert invite_scraper.seen_codes.seen('aB3dE9fG2h')
+    assert invite_scraper.found_codes == []
+
+
+def test_add_codes_reports_failure_as_none(scraper, invite_scraper, monkeypatch):
+    def broken_transaction():
+        raise sqlite3.OperationalError('disk I/O error')
+
+    monkeypatch.setattr(invite_scraper.db, 'conn', FailingWrites(invite_scraper.db.conn, broken_transaction))
+    assert invite_scraper.db.add_codes([('aB3dE9fG2h', 'Web', 'https://example.com')]) is None
+    assert invite_scraper.db.add_codes([]) == []
+
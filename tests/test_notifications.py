@@ -0,0 +1,63 @@
+"""NotificationService retry hints and worker robustness."""
+
+import json
+import threading
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import requests
+
+
+def make_response(status: int, body=None, headers=None) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status
+    response._content = body.encode() if isinstance(body, str) else json.dumps(body).encode()
+    response.headers.update(headers or {})
+    return response
+
+
+@pytest.mark.parametrize('body, headers, expected', [
+    ({'ok': False, 'parameters': {'retry_after': 7}}, {}, 7.0),        # Telegram
+    ({'message': 'You are being rate limited.', 'retry_after': 1.5}, {}, 1.5),  # Discord
+    (['not', 'a', 'dict'], {'Retry-After': '3'}, 3.0),
+    ('<html>slow down</html>', {'Retry-After': '4'}, 4.0),
+    ({'parameters': 'oops', 'retry_after': 'soon'}, {'Retry-After': 'later'}, 9.0),
+    ({'retry_after': 'inf'}, {}, 9.0),
+])
+def test_retry_after_hints(scraper, body, headers, expected):
+    response = make_response(429, body, headers)
+    assert scraper.NotificationService._retry_after(response, 9.0) == expected
+
+
+def test_retry_after_http_date(scraper):
+    when = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+    response = make_response(429, '', {'Retry-After': when})
+    assert 25 <= scraper.NotificationService._retry_after(response, 9.0) <= 30
+
+
+def test_worker_survives_failing_sender(scraper, monkeypatch):
+    monkeypatch.setattr(scraper.Config, 'NOTIFY_COALESCE_SECONDS', 0)
+    sent = []
+    delivered = [threading.Event(), threading.Event()]
+
+    def broken_telegram(self, batch):
+        raise RuntimeError('unexpected payload')
+
+    def discord(self, batch):
+        sent.extend(batch)
+        delivered[len(sent) - 1].set()
+
+    monkeypatch.setattr(scraper.NotificationService, 'send_telegram_batch', broken_telegram)
+    monkeypatch.setattr(scraper.NotificationService, 'send_discord_batch', discord)
+    service = scraper.NotificationService()
+    try:
+        service.notify('aB3dE9fG2h', 'Web', 'https://example.com/1')
+        assert delivered[0].wait(5)
+        # The Telegram failure on the first batch must not have killed the worker
+        service.notify('Zq7Wx2Rt5y', 'Web', 'https://example.com/2')
+        assert delivered[1].wait(5)
+        assert service.worker.is_alive()
+    finally:
+        service.close(timeout=5)
+    assert [code for code, _, _ in sent] == ['aB3dE9fG2h', 'Zq7Wx2Rt5y']
@@ -0,0 +1,73 @@
+"""Batch mode: reading domain lists, per-module concurrency limits and --rate."""
+
+import io
+import threading
+import time
+
+import pytest
+
+
+def test_read_domains_skips_comments_blanks_and_repeats(osint, tmp_path):
+    path = tmp_path / 'domains.txt'
+    path.write_text('# targets\nexample.com\n\nExample.COM  # again\n  other.org\nthird.net\nother.org\n')
+
+    assert osint.read_domains(str(path)) == ['example.com', 'other.org', 'third.net']
+
+
+def test_read_domains_from_stdin(osint, monkeypatch):
+    monkeypatch.setattr(osint.sys, 'stdin', io.StringIO('b.test\na.test\nb.test\n'))
+
+    assert osint.read_domains('-') == ['b.test', 'a.test']
+
+
+def test_read_domains_scales_linearly(osint, tmp_path):
+    path = tmp_path / 'domains.txt'
+    path.write_text(''.join(f'host{n % 50000}.test\n' for n in range(100000)))
+
+    started = time.monotonic()
+    domains = osint.read_domains(str(path))
+    assert len(domains) == 50000
+    assert time.monotonic() - started < 2
+
+
+@pytest.fixture
+def counting_module(osint, monkeypatch):
+    """Register a single slow module that tracks how many copies run at once."""
+    state = {'active': 0, 'peak': 0, 'calls': 0}
+    lock = threading.Lock()
+
+    def lookup(target):
+        with lock:
+            state['active'] += 1
+            state['calls'] += 1
+            state['peak'] = max(state['peak'], state['active'])
+        time.sleep(0.05)
+        with lock:
+            state['active'] -= 1
+        return {'ok': True}
+
+    module = osint.OsintModule('Slow', 'Slow', lookup, ('domain',), {}, ())
+    monkeypatch.setattr(osint, 'MODULES', {'Slow': module})
+    monkeypatch.setattr(osint, 'save_results', lambda domain, results: None)
+    return state
+
+
+def test_module_concurrency_caps_parallel_lookups(osint, counting_module, monkeypatch):
+    monkeypatch.setitem(osint.MODULE_CONCURRENCY, 'Slow', 2)
+
+    osint.run_sweep([f'd{n}.test' for n in range(8)], workers=8)
+
+    assert counting_module['calls'] == 8
+    assert counting_module['peak'] == 2
+
+
+def test_rate_limits_lookups_per_second(osint, counting_module, monkeypatch):
+    monkeypatch.setitem(osint.MODULE_CONCURRENCY, 'Slow', 8)
+
+    started = time.monotonic()
+    osint.run_sweep([f'd{n}.test' for n in range(10)], workers=8, rate=5)
+    elapsed = time.monotonic() - started
+
+    # A one-second burst of 5, then the remaining 5 at 5/s
+    assert counting_module['calls'] == 10
+    assert elapsed >= 0.9
@@ -0,0 +1,106 @@
+"""OSINT result cache: what gets stored, for how long, and under which key.
+
+DNS answers come from the loopback stub nameserver in conftest, so negative
+answers (NXDOMAIN, NODATA) and failures (SERVFAIL, timeouts) are real
+resolver outcomes rather than hand-built exceptions.
+"""
+
+import pytest
+
+from conftest import StubDNSServer
+
+ZONE = {
+    'example.test.': {'A': ['10.0.0.1'], 'MX': ['10 mx.example.test.']},
+    'nodata.test.': {'MX': ['10 mx.nodata.test.']},
+    'badptr.test.': {'A': ['10.0.0.2']},
+    'goneptr.test.': {'A': ['10.0.0.3']},
+    '1.0.0.10.in-addr.arpa.': {'PTR': ['host1.example.test.']},
+}
+
+
+@pytest.fixture
+def stub_dns(osint, monkeypatch):
+    server = StubDNSServer(ZONE, servfail={'servfail.test.', '2.0.0.10.in-addr.arpa.'}, drop={'timeout.test.'})
+    monkeypatch.setattr(osint, 'NAMESERVERS', ['127.0.0.1'])
+    monkeypatch.setattr(osint, 'DNS_PORT', server.port)
+    monkeypatch.setattr(osint, 'DNS_TIMEOUT', 0.3)
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def cache(osint, tmp_path):
+    instance = osint.ResultCache(str(tmp_path / 'cache.sqlite'))
+    yield instance
+    instance.close()
+
+
+def lookup(osint, cache, name, domain):
+    module = osint.MODULES[name]
+    target = osint.Target(domain)
+    result = osint.cached_lookup(cache, name, module.func, target)
+    return result, osint.cache_ttl(name, target, result)
+
+
+@pytest.mark.parametrize('domain', ['example.test', 'nodata.test', 'missing.test'])
+def test_dns_answers_and_negative_answers_are_cached(osint, stub_dns, cache, domain):
+    result, ttl = lookup(osint, cache, 'DNS Records', domain)
+
+    assert ttl and ttl > 0
+    assert cache.get('DNS Records', osint.cache_key('DNS Records', domain)) == result
+
+
+@pytest.mark.parametrize('domain', ['servfail.test', 'timeout.test'])
+def test_dns_failures_are_not_cached(osint, stub_dns, cache, domain):
+    result, ttl = lookup(osint, cache, 'DNS Records', domain)
+
+    assert result['A'] is None
+    assert ttl is None
+    assert cache.get('DNS Records', osint.cache_key('DNS Records', domain)) is None
+
+
+def test_missing_ptr_is_cached(osint, stub_dns, cache):
+    result, ttl = lookup(osint, cache, 'Reverse DNS', 'goneptr.test')
+
+    assert result['PTR'] == []
+    assert cache.get('Reverse DNS', osint.cache_key('Reverse DNS', 'goneptr.test')) == result
+
+
+def test_failed_ptr_is_not_cached(osint, stub_dns, cache):
+    result, ttl = lookup(osint, cache, 'Reverse DNS', 'badptr.test')
+
+    assert result['Addresses'] == {'10.0.0.2': None}
+    assert ttl is None
+    assert cache.get('Reverse DNS', osint.cache_key('Reverse DNS', 'badptr.test')) is None
+
+
+def test_dns_cache_is_keyed_by_nameservers(osint, stub_dns, cache, monkeypatch):
+    result, _ = lookup(osint, cache, 'DNS Records', 'example.test')
+    assert osint.cached_lookup(cache, 'DNS Records', pytest.fail, osint.Target('example.test')) == result
+
+    other = StubDNSServer({'example.test.': {'A': ['10.9.9.9']}})
+    monkeypatch.setattr(osint, 'DNS_PORT', other.port)
+    try:
+        result, _ = lookup(osint, cache, 'DNS Records', 'example.test')
+    finally:
+        other.close()
+    assert result['A'] == ['10.9.9.9']
+
+
+def test_ssl_cache_is_keyed_by_tls_ports(osint, cache, tls_server, monkeypatch):
+    calls = []
+
+    def probe(target):
+        calls.append(list(osint.TLS_PORTS))
+        return osint.ssl_certificate_details(target)
+
+    target = osint.Target('test.local')
+    target.sweep = ({'A': ['127.0.0.1']}, {}, 60)
+    monkeypatch.setattr(osint, 'TLS_PORTS', [tls_server.port])
+    osint.cached_lookup(cache, 'SSL Certificate', probe, target)
+    osint.cached_lookup(cache, 'SSL Certificate', probe, target)
+    monkeypatch.setattr(osint, 'TLS_PORTS', [tls_server.port, tls_server.port + 1])
+    result = osint.cached_lookup(cache, 'SSL Certificate', probe, target)
+
+    assert calls == [[tls_server.port], [tls_server.port, tls_server.port + 1]]
+    assert len(result) == 2
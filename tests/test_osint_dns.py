@@ -0,0 +1,97 @@
+"""The OSINT DNS engine against a stub nameserver on loopback.
+
+The stub answers every query after a fixed delay on its own thread, so a
+sweep that issued its queries one after another would take a multiple of
+that delay. The benchmark reports full sweeps per second in extra_info.
+"""
+
+import time
+
+import pytest
+
+from conftest import StubDNSServer
+
+DELAY = 0.2
+
+ZONE = {
+    'example.test.': {
+        'A': ['10.0.0.1', '10.0.0.2'],
+        'AAAA': ['2001:db8::1'],
+        'MX': ['10 mx.example.test.'],
+        'TXT': ['"v=spf1 -all"'],
+        'NS': ['ns1.example.test.'],
+    },
+    '1.0.0.10.in-addr.arpa.': {'PTR': ['host1.example.test.']},
+    '2.0.0.10.in-addr.arpa.': {'PTR': ['host2.example.test.']},
+    '1.0.0.0.0.0.0.0.0.0.0.0.0.0.0.0.0.0.0.0.0.0.0.0.8.b.d.0.1.0.0.2.ip6.arpa.': {'PTR': ['host6.example.test.']},
+}
+
+
+@pytest.fixture
+def stub_dns(osint, monkeypatch):
+    server = StubDNSServer(ZONE, delay=DELAY)
+    monkeypatch.setattr(osint, 'NAMESERVERS', ['127.0.0.1'])
+    monkeypatch.setattr(osint, 'DNS_PORT', server.port)
+    monkeypatch.setattr(osint, 'DNS_TIMEOUT', 2)
+    yield server
+    server.close()
+
+
+def test_sweep_returns_records_ptrs_and_ttl(osint, stub_dns):
+    target = osint.Target('example.test')
+
+    # Record order within an RRset is not significant
+    assert sorted(target.records['A']) == ['10.0.0.1', '10.0.0.2']
+    assert target.records['MX'] == ['10 mx.example.test.']
+    assert target.records['CNAME'] == []
+    assert sorted(target.addresses) == ['10.0.0.1', '10.0.0.2', '2001:db8::1']
+    assert target.ptrs == {
+        '10.0.0.1': ['host1.example.test.'],
+        '10.0.0.2': ['host2.example.test.'],
+        '2001:db8::1': ['host6.example.test.'],
+    }
+    assert target.ttl == stub_dns.ttl
+
+
+def test_sweep_queries_each_name_once(osint, stub_dns):
+    target = osint.Target('example.test')
+    osint.dns_lookup(target)
+    osint.reverse_dns_lookup(target)
+
+    assert stub_dns.queries[('example.test.', 'A')] == 1
+    assert sum(stub_dns.queries.values()) == len(osint.DNS_RECORD_TYPES) + 3
+
+
+def test_sweep_issues_queries_concurrently(osint, stub_dns):
+    started = time.monotonic()
+    osint.Target('example.test').resolve()
+    elapsed = time.monotonic() - started
+
+    # One round for the record types and one for the PTRs; sequential would be 9 rounds
+    assert elapsed < 4 * DELAY
+
+
+def test_nameserver_pool_rotates(osint, monkeypatch):
+    first = StubDNSServer(ZONE)
+    try:
+        second = StubDNSServer(ZONE, host='127.0.0.2', port=first.port)
+    except OSError:
+        first.close()
+        pytest.skip('127.0.0.2 is not available on this host')
+    monkeypatch.setattr(osint, 'NAMESERVERS', ['127.0.0.1', '127.0.0.2'])
+    monkeypatch.setattr(osint, 'DNS_PORT', first.port)
+    try:
+        for _ in range(5):
+            osint.Target('example.test').resolve()
+    finally:
+        first.close()
+        second.close()
+    assert first.queries and second.queries
+
+
+def test_sweep_benchmark(osint, stub_dns, benchmark):
+    stub_dns.delay = 0.005
+    target = benchmark(lambda: osint.Target('example.test').resolve())
+    records, ptrs, ttl = target
+    assert records['A'] and len(ptrs) == 3
+    benchmark.extra_info['sweeps_per_s'] = round(1 / benchmark.stats.stats.mean, 1)
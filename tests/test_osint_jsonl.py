@@ -0,0 +1,106 @@
+"""JSONL sink crash recovery: files cut off mid-write are read back and resumed.
+
+A crash leaves a plain file ending in a partial line, or a gzip/zstd stream
+with no end-of-stream marker and possibly half a block. The sink flushes every
+record, so the bytes on disk after each write are exactly what a crash at that
+point would leave; the tests copy prefixes of them and resume from the copy.
+"""
+
+import pytest
+
+SUFFIXES = ['.jsonl', '.jsonl.gz', '.jsonl.zst']
+
+
+@pytest.fixture(params=SUFFIXES)
+def suffix(request, osint):
+    if request.param.endswith('.zst') and osint.zstandard is None:
+        pytest.skip('zstandard is not installed')
+    return request.param
+
+
+def crashed_sink(osint, path, records):
+    """Write records without closing the sink; return the file size after each one."""
+    sink = osint.JsonlSink(str(path))
+    sizes = []
+    for domain, module, result in records:
+        sink.write(domain, module, result)
+        sizes.append(path.stat().st_size)
+    return path.read_bytes(), sizes
+
+
+def torn_copy(tmp_path, suffix, data, size):
+    torn = tmp_path / f'torn{suffix}'
+    torn.write_bytes(data[:size])
+    return torn
+
+
+RECORDS = [
+    ('a.test', 'WHOIS', {'registrar': 'Example'}),
+    ('a.test', 'DNS Records', {'A': ['10.0.0.1']}),
+    ('b.test', 'WHOIS', {'registrar': 'Other'}),
+]
+
+
+def test_clean_file_reads_back(osint, tmp_path, suffix):
+    path = tmp_path / f'out{suffix}'
+    sink = osint.JsonlSink(str(path))
+    for record in RECORDS:
+        sink.write(*record)
+    sink.close()
+
+    records, clean = osint.read_jsonl(str(path))
+    assert clean
+    assert [(r['domain'], r['module'], r['result']) for r in records] == RECORDS
+
+
+@pytest.mark.parametrize('cut', ['unterminated', 'torn'])
+def test_resume_after_crash(osint, tmp_path, suffix, cut):
+    data, sizes = crashed_sink(osint, tmp_path / f'out{suffix}', RECORDS)
+    # Either everything was flushed but the stream never closed, or the last record is half written
+    size = sizes[-1] if cut == 'unterminated' else (sizes[-2] + sizes[-1]) // 2
+    torn = torn_copy(tmp_path, suffix, data, size)
+    survivors = RECORDS if cut == 'unterminated' else RECORDS[:2]
+
+    records, clean = osint.read_jsonl(str(torn))
+    # A plain file is only torn by a partial line; compressed streams also need their end marker
+    assert clean == (suffix == '.jsonl' and cut == 'unterminated')
+    assert [(r['domain'], r['module']) for r in records] == [(d, m) for d, m, _ in survivors]
+
+    sink = osint.JsonlSink(str(torn), resume=True)
+    assert sink.done == {(d, m) for d, m, _ in survivors}
+    sink.write('c.test', 'WHOIS', {'registrar': 'New'})
+    sink.close()
+
+    records, clean = osint.read_jsonl(str(torn))
+    assert clean
+    assert [r['domain'] for r in records] == [d for d, _, _ in survivors] + ['c.test']
+
+
+def test_resume_appends_to_a_closed_file(osint, tmp_path, suffix):
+    path = tmp_path / f'out{suffix}'
+    sink = osint.JsonlSink(str(path))
+    sink.write(*RECORDS[0])
+    sink.close()
+
+    sink = osint.JsonlSink(str(path), resume=True)
+    sink.write(*RECORDS[1])
+    sink.close()
+
+    records, clean = osint.read_jsonl(str(path))
+    assert clean
+    assert len(records) == 2
+
+
+def test_failed_lookups_are_retried_on_resume(osint, tmp_path):
+    path = tmp_path / 'out.jsonl'
+    sink = osint.JsonlSink(str(path))
+    sink.write('a.test', 'WHOIS', {'registrar': 'Example'})
+    sink.write('a.test', 'Threat Intelligence', {'error': 'connection reset'})
+    sink.write('a.test', 'Shodan', {'10.0.0.1': {'error': 'no information'}})
+    assert ('a.test', 'Threat Intelligence') not in sink.done
+    sink.close()
+
+    sink = osint.JsonlSink(str(path), resume=True)
+    assert sink.done == {('a.test', 'WHOIS'), ('a.test', 'Shodan')}
+    assert 'Threat Intelligence' in osint.modules_to_run('a.test', sink.done)
+    sink.close()
@@ -0,0 +1,135 @@
+"""The OSINT provider client against a mock threat-intel API on loopback.
+
+The mock counts requests and client connections, can throttle its first
+request with a 429, and advertises X-RateLimit headers on every success.
+"""
+
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+
+class MockProvider(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, throttle_first=False, delay=0.0):
+        self.throttle_first = throttle_first
+        self.delay = delay
+        self.hits = []
+        self.connections = set()
+        self.lock = threading.Lock()
+        super().__init__(('127.0.0.1', 0), MockHandler)
+        self.url = f'http://127.0.0.1:{self.server_address[1]}'
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.shutdown()
+        self.server_close()
+        self.thread.join()
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.hits.append(self.path)
+            server.connections.add(self.client_address)
+            first = len(server.hits) == 1
+        time.sleep(server.delay)
+        if first and server.throttle_first:
+            body = b'{}'
+            self.send_response(429)
+            self.send_header('Retry-After', '1')
+        else:
+            body = json.dumps({'path': self.path}).encode()
+            self.send_response(200)
+            self.send_header('X-RateLimit-Remaining', '50')
+            self.send_header('X-RateLimit-Reset', '10')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def provider():
+    servers = []
+
+    def start(**kwargs):
+        servers.append(MockProvider(**kwargs))
+        return servers[-1]
+
+    yield start
+    for server in servers:
+        server.close()
+
+
+def client(osint, server):
+    return osint.ProviderClient('Mock', server.url, 100.0)
+
+
+def test_backs_off_on_429(osint, provider):
+    server = provider(throttle_first=True)
+    started = time.monotonic()
+    data = client(osint, server).get('/check', {'ip': '10.0.0.1'})
+
+    assert data == {'path': '/check?ip=10.0.0.1'}
+    assert len(server.hits) == 2
+    assert time.monotonic() - started >= 1
+
+
+def test_reuses_one_connection(osint, provider):
+    server = provider()
+    instance = client(osint, server)
+    for n in range(10):
+        instance.get('/check', {'ip': f'10.0.0.{n}'})
+
+    assert len(server.hits) == 10
+    assert len(server.connections) == 1
+
+
+def test_coalesces_identical_requests(osint, provider):
+    server = provider(delay=0.2)
+    instance = client(osint, server)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda _: instance.get('/check', {'ip': '10.0.0.1'}), range(8)))
+    instance.get('/check', {'ip': '10.0.0.1'})
+
+    assert len(server.hits) == 1
+    assert all(result == results[0] for result in results)
+
+
+def test_remembered_responses_are_bounded(osint, provider, monkeypatch):
+    monkeypatch.setattr(osint, 'PROVIDER_MEMO_SIZE', 3)
+    server = provider()
+    instance = client(osint, server)
+    for n in range(10):
+        instance.get('/check', {'ip': f'10.0.0.{n}'})
+    assert len(instance.calls) == 3
+
+    instance.get('/check', {'ip': '10.0.0.9'})
+    instance.get('/check', {'ip': '10.0.0.0'})
+    assert len(server.hits) == 11
+
+
+def test_sweep_forgets_responses_when_done(osint, provider, monkeypatch):
+    server = provider()
+    instance = client(osint, server)
+    probe = osint.OsintModule('Probe', 'Probe', lambda target: instance.get('/check', {'ip': '10.0.0.1'}),
+                              ('domain',), {}, ())
+    monkeypatch.setattr(osint, 'MODULES', {'Probe': probe})
+    monkeypatch.setattr(osint, 'PROVIDERS', (instance,))
+
+    osint.run_sweep(['a.test', 'b.test', 'c.test'], workers=3)
+
+    assert len(server.hits) == 1
+    assert not instance.calls
@@ -0,0 +1,142 @@
+"""run_sweep as a dependency DAG, with a registry of fake modules.
+
+Each fake module records when it ran for which domain, so the tests can
+check ordering and overlap without any network lookups.
+"""
+
+import threading
+import time
+
+import pytest
+
+
+class Recorder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.spans = []
+
+    def module(self, osint, name, requires=('domain',), provides=None, delay=0.0, result=None):
+        def run(target):
+            started = time.monotonic()
+            time.sleep(delay)
+            with self.lock:
+                self.spans.append((name, target.domain, started, time.monotonic()))
+            return result(target.domain) if result else {'ok': True}
+        return osint.OsintModule(name, name, run, tuple(requires), dict(provides or {}), ())
+
+    def span(self, name, domain):
+        return next((start, end) for n, d, start, end in self.spans if (n, d) == (name, domain))
+
+    def calls(self, name):
+        return sorted(d for n, d, _, _ in self.spans if n == name)
+
+
+@pytest.fixture
+def recorder():
+    return Recorder()
+
+
+@pytest.fixture
+def registry(osint, monkeypatch):
+    modules = {}
+    monkeypatch.setattr(osint, 'MODULES', modules)
+    return modules
+
+
+def sink_records(osint, path):
+    records, clean = osint.read_jsonl(str(path))
+    assert clean
+    return sorted((record['domain'], record['module']) for record in records)
+
+
+def test_dependents_wait_while_independent_modules_overlap(osint, registry, recorder, tmp_path):
+    registry['Resolve'] = recorder.module(osint, 'Resolve', provides={'addresses': lambda r: r['addresses']},
+                                          delay=0.2, result=lambda domain: {'addresses': ['10.0.0.1']})
+    registry['Whois'] = recorder.module(osint, 'Whois', delay=0.2)
+    registry['Probe'] = recorder.module(osint, 'Probe', requires=('addresses',))
+    sink = osint.JsonlSink(str(tmp_path / 'out.jsonl'))
+
+    osint.run_sweep(['a.test'], workers=4, sink=sink)
+    sink.close()
+
+    resolve, whois, probe = (recorder.span(name, 'a.test') for name in ('Resolve', 'Whois', 'Probe'))
+    assert probe[0] >= resolve[1]
+    assert whois[0] < resolve[1] and resolve[0] < whois[1]
+    assert sink_records(osint, tmp_path / 'out.jsonl') == [('a.test', 'Probe'), ('a.test', 'Resolve'),
+                                                           ('a.test', 'Whois')]
+
+
+def test_failed_producer_still_releases_dependents(osint, registry, recorder, tmp_path):
+    def broken(target):
+        raise RuntimeError('lookup failed')
+
+    registry['Resolve'] = osint.OsintModule('Resolve', 'Resolve', broken, ('domain',),
+                                            {'addresses': lambda r: r['addresses']}, ())
+    registry['Probe'] = recorder.module(osint, 'Probe', requires=('addresses',))
+    sink = osint.JsonlSink(str(tmp_path / 'out.jsonl'))
+
+    osint.run_sweep(['a.test'], workers=2, sink=sink)
+    sink.close()
+
+    assert recorder.calls('Probe') == ['a.test']
+
+
+@pytest.mark.parametrize('depth, budget, expected', [
+    (0, 100, 1),
+    (1, 100, 3),
+    (2, 100, 7),
+    (2, 3, 4),
+])
+def test_expansion_respects_depth_and_budget(osint, registry, recorder, tmp_path, depth, budget, expected):
+    # Every certificate lists two subdomains of the domain it was served for
+    registry['Certs'] = recorder.module(osint, 'Certs', provides={'sans': lambda r: r['sans']},
+                                        result=lambda domain: {'sans': [f'a.{domain}', f'b.{domain}']})
+    sink = osint.JsonlSink(str(tmp_path / 'out.jsonl'))
+
+    osint.run_sweep(['root.test'], workers=4, sink=sink, max_depth=depth, budget=budget)
+    sink.close()
+
+    assert len(recorder.calls('Certs')) == expected
+    records, _ = osint.read_jsonl(str(tmp_path / 'out.jsonl'))
+    assert max(record['depth'] for record in records) == min(depth, 2)
+    for record in records:
+        if record['depth']:
+            assert record['domain'].endswith('.' + record['parent'])
+
+
+def test_resume_reruns_producers_without_recording_them(osint, registry, recorder, tmp_path):
+    registry['Resolve'] = recorder.module(osint, 'Resolve', provides={'addresses': lambda r: r['addresses']},
+                                          result=lambda domain: {'addresses': ['10.0.0.1']})
+    registry['Whois'] = recorder.module(osint, 'Whois')
+    registry['Probe'] = recorder.module(osint, 'Probe', requires=('addresses',))
+    path = tmp_path / 'out.jsonl'
+    sink = osint.JsonlSink(str(path))
+    for module in ('Resolve', 'Whois'):
+        sink.write('a.test', module, {'addresses': ['10.0.0.1']})
+    for module in ('Resolve', 'Whois', 'Probe'):
+        sink.write('b.test', module, {'addresses': ['10.0.0.1']})
+    sink.close()
+
+    assert osint.modules_to_run('a.test', osint.JsonlSink(str(path), resume=True).done) == {'Resolve', 'Probe'}
+    sink = osint.JsonlSink(str(path), resume=True)
+    osint.run_sweep(['a.test', 'b.test'], workers=4, sink=sink)
+    sink.close()
+
+    # Resolve ran again to publish the addresses Probe needs, but only Probe is new in the file
+    assert recorder.calls('Resolve') == ['a.test']
+    assert recorder.calls('Whois') == []
+    assert recorder.calls('Probe') == ['a.test']
+    assert sink_records(osint, path).count(('a.test', 'Resolve')) == 1
+    assert ('a.test', 'Probe') in sink_records(osint, path)
+
+
+def test_console_is_unmuted_when_the_sweep_fails(osint, registry, recorder, monkeypatch):
+    registry['Whois'] = recorder.module(osint, 'Whois')
+
+    def interrupted(domain, results):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(osint, 'save_results', interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        osint.run_sweep(['a.test'], workers=4)
+    assert osint.console.quiet is False
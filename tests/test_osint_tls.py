@@ -0,0 +1,78 @@
+"""The OSINT TLS harvester against self-signed servers on loopback.
+
+The certificate is generated with openssl for test.local and *.test.local.
+The benchmark harvests many endpoints in one event loop and reports
+handshakes/s in extra_info.
+"""
+
+import socket
+
+from conftest import LocalTLSServer
+
+HANDSHAKES = 200
+
+
+def closed_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def resolved_target(osint, domain, addresses):
+    target = osint.Target(domain)
+    target.sweep = ({'A': addresses}, {}, 60)
+    return target
+
+
+def test_harvest_records_self_signed_chain(osint, tls_server):
+    result = osint.asyncio.run(osint.harvest_tls([('127.0.0.1', tls_server.port, 'www.test.local')]))
+
+    probe = result[f'127.0.0.1:{tls_server.port}']
+    leaf = probe['chain'][0]
+    assert probe['tls_version'].startswith('TLS')
+    assert probe['hostname_match'] is True
+    assert leaf['subject'] == {'commonName': 'test.local'}
+    assert leaf['sans'] == ['test.local', '*.test.local']
+    assert leaf['self_signed'] is True
+    assert 28 <= leaf['days_left'] <= 30
+
+
+def test_harvest_flags_hostname_mismatch(osint, tls_server):
+    result = osint.asyncio.run(osint.harvest_tls([('127.0.0.1', tls_server.port, 'a.b.test.local')]))
+
+    assert result[f'127.0.0.1:{tls_server.port}']['hostname_match'] is False
+
+
+def test_ssl_module_probes_every_address_and_port(osint, tls_server, tls_cert, monkeypatch):
+    second = LocalTLSServer(*tls_cert)
+    down = closed_port()
+    monkeypatch.setattr(osint, 'TLS_PORTS', [tls_server.port, second.port, down])
+    monkeypatch.setattr(osint, 'TLS_TIMEOUT', 2)
+    try:
+        result = osint.ssl_certificate_details(resolved_target(osint, 'test.local', ['127.0.0.1']))
+    finally:
+        second.close()
+
+    assert result[f'127.0.0.1:{tls_server.port}']['hostname_match'] is True
+    assert result[f'127.0.0.1:{second.port}']['hostname_match'] is True
+    assert 'error' in result[f'127.0.0.1:{down}']
+
+
+def test_ssl_cache_entry_expires_before_the_certificate(osint, tls_server, monkeypatch):
+    monkeypatch.setattr(osint, 'TLS_PORTS', [tls_server.port])
+    result = osint.ssl_certificate_details(resolved_target(osint, 'test.local', ['127.0.0.1']))
+
+    ttl = osint.cache_ttl('SSL Certificate', None, result)
+    days_left = result[f'127.0.0.1:{tls_server.port}']['chain'][0]['days_left']
+    assert (days_left - 1) * 86400 <= ttl + osint.SSL_EXPIRY_MARGIN <= (days_left + 1) * 86400
+
+
+def test_harvest_benchmark(osint, tls_server, benchmark):
+    endpoints = [('127.0.0.1', tls_server.port, 'test.local')] * HANDSHAKES
+
+    def harvest():
+        return osint.asyncio.run(osint.harvest_tls(endpoints, concurrency=64))
+
+    result = benchmark.pedantic(harvest, rounds=3, iterations=1)
+    assert 'error' not in result[f'127.0.0.1:{tls_server.port}']
+    benchmark.extra_info['handshakes_per_s'] = round(HANDSHAKES / benchmark.stats.stats.mean, 1)
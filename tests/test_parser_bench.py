@@ -0,0 +1,69 @@
+"""Throughput and peak memory of the HTML parsing backends on a saved page corpus.
+
+Text mode is the scraper's html_to_text, which only needs the visible text;
+DOM mode is analyze_references' BeautifulSoup tree for UI analysis.
+Peak memory is recorded in each benchmark's extra_info.
+"""
+
+import tracemalloc
+
+import pytest
+
+from conftest import FIXTURES
+
+PAGES = {path.name: path.read_text() for path in sorted((FIXTURES / 'pages').glob('*.html'))}
+CORPUS_BYTES = sum(len(page.encode()) for page in PAGES.values())
+
+
+def peak_memory(parse) -> int:
+    """Peak bytes allocated while parsing the whole corpus once."""
+    tracemalloc.start()
+    try:
+        for page in PAGES.values():
+            parse(page)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_corpus(parse):
+    return [parse(page) for page in PAGES.values()]
+
+
+@pytest.mark.parametrize('backend', ['lxml', 'html.parser', 'bs4'])
+def test_text_backend(scraper, benchmark, monkeypatch, backend):
+    if backend == 'lxml':
+        pytest.importorskip('lxml')
+    monkeypatch.setattr(scraper.Config, 'HTML_TEXT_BACKEND', backend)
+    texts = benchmark(run_corpus, scraper.html_to_text)
+    benchmark.extra_info['corpus_bytes'] = CORPUS_BYTES
+    benchmark.extra_info['peak_memory_bytes'] = peak_memory(scraper.html_to_text)
+    # Script and style content never reaches the code extractor
+    assert all('window.__STATE__' not in text and 'margin:' not in text for text in texts)
+
+
+def test_streaming_text_uses_less_memory_than_a_tree(scraper, monkeypatch):
+    pytest.importorskip('lxml')
+    peaks = {}
+    for backend in ('lxml', 'bs4'):
+        monkeypatch.setattr(scraper.Config, 'HTML_TEXT_BACKEND', backend)
+        peaks[backend] = peak_memory(scraper.html_to_text)
+    assert peaks['lxml'] < peaks['bs4']
+
+
+@pytest.mark.parametrize('builder', ['lxml', 'html.parser', 'html5lib'])
+def test_dom_backend(analyzer_module, benchmark, monkeypatch, builder):
+    if builder != 'html.parser':
+        pytest.importorskip(builder)
+    monkeypatch.setattr(analyzer_module, 'PARSER_BACKEND', builder)
+    analyzer = analyzer_module.AirdropAnalyzer()
+
+    def analyze(page):
+        return analyzer.extract_ui_patterns(page, 'https://example.com')
+
+    patterns = benchmark(run_corpus, analyze)
+    benchmark.extra_info['corpus_bytes'] = CORPUS_BYTES
+    benchmark.extra_info['peak_memory_bytes'] = peak_memory(analyze)
+    listing = patterns[list(PAGES).index('airdrop_listing.html')]
+    assert listing['listing_structure']['count'] == 400
+    assert listing['navigation']['has_wallet_connect']
@@ -0,0 +1,45 @@
+"""Per-source cProfile captures under both profiling strategies."""
+
+import pstats
+import sys
+import threading
+
+import pytest
+
+
+@pytest.mark.parametrize('per_thread', [True, False], ids=['per-thread', 'single-profiler'])
+def test_profiled_run_writes_one_profile(scraper, replay_scraper, tmp_path, monkeypatch, per_thread):
+    if per_thread and sys.version_info >= (3, 12):
+        pytest.skip('concurrent profilers raise ValueError on Python 3.12+')
+    monkeypatch.setattr(scraper, 'PROFILE_PER_THREAD', per_thread)
+    monkeypatch.setattr(scraper.Config, 'PROFILE_DIR', str(tmp_path / 'profiles'))
+    assert replay_scraper.run_source('Reddit') > 0
+
+    [profile] = (tmp_path / 'profiles').glob('Reddit_*.prof')
+    functions = {name for _, _, name in pstats.Stats(str(profile)).stats}
+    assert 'search_reddit_keyword' in functions
+
+
+def test_single_profiler_skips_overlapping_sources(scraper, replay_scraper, tmp_path, monkeypatch):
+    monkeypatch.setattr(scraper, 'PROFILE_PER_THREAD', False)
+    monkeypatch.setattr(scraper.Config, 'PROFILE_DIR', str(tmp_path / 'profiles'))
+    errors = []
+
+    def run(source):
+        try:
+            replay_scraper.run_source(source)
+        except Exception as e:  # a second active profiler raises ValueError on 3.12+
+            errors.append(e)
+
+    # Another source's run holds the profiler for the whole time
+    with replay_scraper.profile_lock:
+        threads = [threading.Thread(target=run, args=(source,)) for source in ('Reddit', 'Twitter')]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert errors == []
+    assert not (tmp_path / 'profiles').exists()
+    assert replay_scraper.db.count_codes() > 0
+    assert not replay_scraper.profile_lock.locked()
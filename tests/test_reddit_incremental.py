@@ -0,0 +1,145 @@
+"""Incremental Reddit scanning against recorded fixtures: API calls, runtime and state safety."""
+
+import copy
+import sqlite3
+
+import pytest
+
+from conftest import FIXTURES, FailingWrites
+
+REPLAY_DIR = FIXTURES / 'replay'
+
+
+class CountingReddit:
+    """Replays recorded submissions and counts the requests praw would make.
+    
+    A search is one request, and so is reading a submission's comments.
+    """
+
+    def __init__(self, replay):
+        self.replay = replay
+        self.searches = 0
+        self.comment_fetches = 0
+
+    def subreddit(self, name):
+        return self
+
+    def search(self, keyword, limit=100):
+        self.searches += 1
+        for submission in self.replay.search(keyword, limit):
+            yield CountingSubmission(submission, self)
+
+    def calls(self):
+        return self.searches + self.comment_fetches
+
+
+class CountingSubmission:
+    def __init__(self, submission, counter):
+        self._submission = submission
+        self._counter = counter
+
+    @property
+    def comments(self):
+        self._counter.comment_fetches += 1
+        return self._submission.comments
+
+    def __getattr__(self, name):
+        return getattr(self._submission, name)
+
+
+@pytest.fixture
+def store(scraper):
+    store = scraper.FixtureStore(str(REPLAY_DIR))
+    store.replay = lambda: scraper.ReplayReddit(store)
+    return store
+
+
+def scan(invite_scraper, store):
+    """Run every Reddit keyword once and flush; return the request counter."""
+    reddit = invite_scraper.reddit_api = CountingReddit(store.replay())
+    for keyword in invite_scraper.source_keywords('Reddit'):
+        invite_scraper.search_reddit_keyword(keyword)
+    invite_scraper.flush_found_codes()
+    return reddit
+
+
+def test_second_run_skips_unchanged_submissions(invite_scraper, store):
+    cold = scan(invite_scraper, store)
+    stored = invite_scraper.db.count_codes()
+    assert stored > 0
+    # Overlapping keyword results are fetched once per run, not once per keyword
+    submissions = {item['id'] for items in store.data['reddit'].values() for item in items}
+    assert cold.comment_fetches == len(submissions)
+
+    warm = scan(invite_scraper, store)
+    assert warm.searches == 3
+    assert warm.comment_fetches == 0
+    assert invite_scraper.db.count_codes() == stored
+
+
+def test_new_comments_are_the_only_ones_scanned(invite_scraper, store):
+    scan(invite_scraper, store)
+    stored = invite_scraper.db.count_codes()
+
+    data = copy.deepcopy(store.data['reddit'])
+    submission = data['Farcaster invite code'][0]
+    submission['comments'].append({'id': 'cnew', 'body': 'one more: Hq4Zx8Vb2N',
+                                   'created_utc': max(c['created_utc'] for c in submission['comments']) + 60})
+    submission['num_comments'] += 1
+    for items in data.values():
+        for item in items:
+            if item['id'] == submission['id']:
+                item.update(submission)
+    store.data['reddit'] = data
+
+    warm = scan(invite_scraper, store)
+    assert warm.comment_fetches == 1
+    assert invite_scraper.db.count_codes() == stored + 1
+
+
+def test_state_waits_for_the_codes_to_commit(invite_scraper, store, monkeypatch):
+    def locked(*args, **kwargs):
+        raise sqlite3.OperationalError('database is locked')
+
+    real_conn = invite_scraper.db.conn
+    with monkeypatch.context() as patch:
+        patch.setattr(invite_scraper.db, 'conn', FailingWrites(real_conn, locked))
+        scan(invite_scraper, store)
+    # Nothing committed: no high-water mark may claim those submissions were scanned
+    assert real_conn.execute('SELECT COUNT(*) FROM reddit_submissions').fetchone()[0] == 0
+    assert invite_scraper.db.count_codes() == 0
+
+    invite_scraper.flush_found_codes()
+    assert real_conn.execute('SELECT COUNT(*) FROM reddit_submissions').fetchone()[0] > 0
+    assert invite_scraper.db.count_codes() > 0
+
+
+@pytest.mark.parametrize('state', ['cold', 'warm'])
+def test_benchmark_reddit_scan(scraper, invite_scraper, store, benchmark, state):
+    def reset():
+        with invite_scraper.db.conn:
+            invite_scraper.db.conn.execute('DELETE FROM invite_codes')
+            invite_scraper.db.conn.execute('DELETE FROM reddit_submissions')
+        invite_scraper.seen_codes = scraper.SeenCodeCache()
+
+    def setup():
+        if state == 'cold':
+            reset()
+
+    reset()
+    if state == 'warm':
+        scan(invite_scraper, store)
+    reddit = benchmark.pedantic(scan, args=(invite_scraper, store), setup=setup, rounds=10)
+    benchmark.extra_info['api_calls_per_run'] = reddit.calls()
+    benchmark.extra_info['comment_fetches_per_run'] = reddit.comment_fetches
+
+
+def test_title_anchors_codes_in_the_body(scraper, invite_scraper):
+    store = scraper.FixtureStore(str(REPLAY_DIR))
+    store.data['reddit'] = {'Farcaster invite code': [{
+        'id': 't3_anchor', 'title': 'Got spare Farcaster invites', 'selftext': 'Here are mine: aB3dE9fG2h',
+        'url': 'https://www.reddit.com/r/farcaster/comments/anchor/', 'num_comments': 0, 'comments': []
+    }]}
+    invite_scraper.reddit_api = scraper.ReplayReddit(store)
+    invite_scraper.search_reddit_keyword('Farcaster invite code')
+    assert [code for code, _, _ in invite_scraper.flush_found_codes()] == ['aB3dE9fG2h']
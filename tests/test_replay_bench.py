@@ -0,0 +1,77 @@
+"""Full replayed search iterations: offline guarantees and throughput.
+
+Every benchmark round replays the recorded Twitter, Reddit and web fixtures
+through InviteCodeScraper.run_search against fresh databases, and reports
+iterations/s, codes/s and peak memory in extra_info.
+"""
+
+import os
+import tracemalloc
+
+import pytest
+
+from conftest import FIXTURES
+
+
+@pytest.fixture
+def offline(scraper, monkeypatch):
+    """Replay configuration with live credentials set, to prove none of them are used."""
+    monkeypatch.setattr(scraper.Config, 'REPLAY_MODE', 'benchmark')
+    monkeypatch.setattr(scraper.Config, 'FIXTURES_DIR', str(FIXTURES / 'replay'))
+    monkeypatch.setattr(scraper.Config, 'VALIDATOR_URL', 'https://validator.invalid/{code}')
+    monkeypatch.setattr(scraper.Config, 'TELEGRAM_BOT_TOKEN', 'token')
+    monkeypatch.setattr(scraper.Config, 'TELEGRAM_CHAT_ID', 'chat')
+
+    def forbidden(*args, **kwargs):
+        raise AssertionError('replays must not build live notification or validation clients')
+
+    monkeypatch.setattr(scraper, 'NotificationService', forbidden)
+    monkeypatch.setattr(scraper, 'HttpCodeValidator', forbidden)
+    return scraper
+
+
+def test_replay_is_offline(offline):
+    instance = offline.InviteCodeScraper()
+    try:
+        new_codes = instance.run_search()
+    finally:
+        instance.close()
+    assert new_codes > 0
+    assert instance.verifier is None
+    assert len(instance.notification.sent) == new_codes
+
+
+def test_benchmark_replayed_iteration(offline, tmp_path, benchmark):
+    rounds = []
+
+    def setup():
+        workdir = tmp_path / f'round{len(rounds)}'
+        workdir.mkdir()
+        os.chdir(workdir)
+        instance = offline.InviteCodeScraper()
+        rounds.append(instance)
+        return (instance,), {}
+
+    def iterate(instance):
+        return instance.run_search()
+
+    try:
+        new_codes = benchmark.pedantic(iterate, setup=setup, rounds=5)
+    finally:
+        for instance in rounds:
+            instance.close()
+    assert new_codes > 0
+
+    stats = benchmark.stats.stats
+    benchmark.extra_info['iterations_per_second'] = 1 / stats.mean
+    benchmark.extra_info['codes_per_second'] = new_codes / stats.mean
+
+    os.chdir(tmp_path)
+    tracemalloc.start()
+    try:
+        instance = offline.InviteCodeScraper()
+        instance.run_search()
+        instance.close()
+        benchmark.extra_info['peak_memory_bytes'] = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
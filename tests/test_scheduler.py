@@ -0,0 +1,38 @@
+"""SourceScheduler run metrics reach the metrics registry; run_search fans out across sources."""
+
+import threading
+
+
+def test_scheduler_metrics_are_published(scraper, invite_scraper, monkeypatch):
+    monkeypatch.setattr(invite_scraper, 'run_source', lambda source: 3 if source == 'Reddit' else 0)
+    scheduler = scraper.SourceScheduler(invite_scraper)
+    try:
+        scheduler._run_job(scheduler.jobs['Reddit'])
+        scheduler._run_job(scheduler.jobs['Web'])
+    finally:
+        scheduler.shutdown()
+
+    rendered = scraper.metrics.render()
+    assert 'scraper_source_runs_total{source="Reddit"} 1' in rendered
+    assert 'scraper_source_last_new_codes{source="Reddit"} 3' in rendered
+    web_interval = scheduler.jobs['Web'].current_interval
+    assert f'scraper_source_interval_seconds{{source="Web"}} {web_interval}' in rendered
+    # The scheduler rewrites the metrics file once the run has been recorded
+    with open(scraper.Config.METRICS_PATH) as f:
+        assert 'scraper_source_runs_total{source="Web"} 1' in f.read()
+
+
+def test_run_search_runs_sources_concurrently(scraper, invite_scraper, monkeypatch):
+    running = []
+    overlapped = threading.Event()
+
+    def run_source(source):
+        running.append(source)
+        if len(running) == 3:
+            overlapped.set()
+        # Every source waits for the others to start; run one after another this would time out
+        return 1 if overlapped.wait(timeout=2) else 0
+
+    monkeypatch.setattr(invite_scraper, 'run_source', run_source)
+    assert invite_scraper.run_search() == 3
+    assert sorted(running) == ['Reddit', 'Twitter', 'Web']
@@ -0,0 +1,46 @@
+"""Twitter since_id cursors only advance once the tweets' codes are stored."""
+
+import sqlite3
+
+import pytest
+
+from conftest import FIXTURES, FailingWrites
+
+
+@pytest.fixture
+def twitter_scraper(scraper, invite_scraper):
+    invite_scraper.twitter_api = scraper.ReplayTwitterAPI(scraper.FixtureStore(str(FIXTURES / 'replay')))
+    return invite_scraper
+
+
+def search(invite_scraper):
+    for query in invite_scraper.twitter_queries():
+        invite_scraper.search_twitter_keyword(query)
+
+
+def test_cursor_waits_for_the_codes_to_commit(twitter_scraper, monkeypatch):
+    def locked(*args, **kwargs):
+        raise sqlite3.OperationalError('database is locked')
+
+    query = twitter_scraper.twitter_queries()[0]
+    with monkeypatch.context() as patch:
+        patch.setattr(twitter_scraper.db, 'conn', FailingWrites(twitter_scraper.db.conn, locked))
+        search(twitter_scraper)
+        twitter_scraper.flush_found_codes()
+    assert twitter_scraper.db.get_twitter_cursor(query) is None
+
+    twitter_scraper.flush_found_codes()
+    newest = max(tweet['id'] for tweet in twitter_scraper.twitter_api.store.get('twitter', query))
+    assert twitter_scraper.db.get_twitter_cursor(query) == newest
+    assert twitter_scraper.db.count_codes() > 0
+
+
+def test_queued_cursor_is_used_before_the_flush(twitter_scraper):
+    search(twitter_scraper)
+    queued = len(twitter_scraper.found_codes)
+    assert queued > 0
+    # A second search in the same run only asks for tweets newer than the queued cursor
+    with twitter_scraper.tweet_ids_lock:
+        twitter_scraper.seen_tweet_ids.clear()
+    search(twitter_scraper)
+    assert len(twitter_scraper.found_codes) == queued
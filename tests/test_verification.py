@@ -0,0 +1,89 @@
+"""Background code verification: scraping never waits on the validator."""
+
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+
+@pytest.fixture
+def validator_class(scraper):
+    class SlowValidator(scraper.CodeValidator):
+        """Takes a while per code; codes starting with 'X' are invalid."""
+
+        def __init__(self):
+            self.checked = []
+
+        def check(self, code):
+            time.sleep(0.3)
+            self.checked.append(code)
+            return not code.startswith('X')
+
+    return SlowValidator
+
+
+def test_code_validator_is_abstract(scraper):
+    with pytest.raises(TypeError):
+        scraper.CodeValidator()
+
+    class Incomplete(scraper.CodeValidator):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_flush_does_not_wait_for_verification(scraper, invite_scraper, validator_class):
+    validator = validator_class()
+    notifier = invite_scraper.notification = scraper.ReplayNotifier()
+    invite_scraper.verifier = scraper.VerificationStage(invite_scraper.db, validator)
+    for code in ('aB3dE9fG2h', 'Xq7Wx2Rt5y', 'Pm4Kc8Ln1v'):
+        invite_scraper.process_found_code(code, 'Web', f'https://example.com/{code}')
+
+    started = time.monotonic()
+    assert len(invite_scraper.flush_found_codes()) == 3
+    assert time.monotonic() - started < 0.2
+    assert notifier.sent == []
+
+    invite_scraper.verifier.close()
+    assert sorted(code for code, _, _ in notifier.sent) == ['Pm4Kc8Ln1v', 'aB3dE9fG2h']
+    verdicts = invite_scraper.db.get_verdicts(['Xq7Wx2Rt5y'])
+    assert verdicts['Xq7Wx2Rt5y'][0] == 0
+
+
+def test_stale_verdicts_are_rechecked_in_the_background(scraper, invite_scraper, validator_class, monkeypatch):
+    validator = validator_class()
+    invite_scraper.db.add_codes([('aB3dE9fG2h', 'Web', 'https://example.com')])
+    stage = invite_scraper.verifier = scraper.VerificationStage(invite_scraper.db, validator)
+
+    # run_source no longer rechecks inline
+    with monkeypatch.context() as patch:
+        patch.setattr(stage, 'recheck_stale', lambda: pytest.fail('recheck on the scraping path'))
+        invite_scraper.run_source('Twitter')
+
+    monkeypatch.setattr(scraper.Config, 'VERIFY_RECHECK_INTERVAL', 0.05)
+    stage.start_rechecks()
+    deadline = time.monotonic() + 5
+    while not validator.checked and time.monotonic() < deadline:
+        time.sleep(0.05)
+    stage.close()
+    assert validator.checked[:1] == ['aB3dE9fG2h']
+    is_valid, checked_at = invite_scraper.db.get_verdicts(['aB3dE9fG2h'])['aB3dE9fG2h']
+    assert is_valid == 1 and checked_at > datetime.now() - timedelta(minutes=1)
+    assert not stage.rechecker.is_alive()
+
+
+def test_verdict_lookup_fits_old_sqlite_parameter_limit(scraper, invite_scraper):
+    db = invite_scraper.db
+    if not hasattr(db.conn, 'setlimit'):
+        pytest.skip('Connection.setlimit needs Python 3.11+')
+    codes = [f'c{n:07d}Zz' for n in range(scraper.Config.INGEST_BATCH_SIZE)]
+    db.add_codes((code, 'Web', 'https://example.com') for code in codes)
+    # SQLite before 3.32 allowed at most 999 bound parameters per statement
+    db.conn.setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, 999)
+
+    verdicts = db.get_verdicts(codes)
+
+    assert len(verdicts) == len(codes)
+    assert verdicts[codes[-1]] == (None, None)
@@ -0,0 +1,47 @@
+"""Multi-process mode: spawned workers, with the main process as the only writer."""
+
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import textwrap
+
+from conftest import FIXTURES, SCRAPER_PATH
+
+DRIVER = textwrap.dedent('''
+    import json
+    import farcaster_scraper
+
+    if __name__ == "__main__":
+        scraper = farcaster_scraper.InviteCodeScraper()
+        new_codes = farcaster_scraper.run_workers(scraper, 2)
+        scraper.close()
+        print(json.dumps({"new_codes": new_codes, "stored": scraper.db.count_codes()}))
+''')
+
+
+def test_spawned_workers_send_codes_and_progress_to_the_writer(tmp_path):
+    # Spawned children import the scraper by name, so it needs an importable alias
+    (tmp_path / 'farcaster_scraper.py').symlink_to(SCRAPER_PATH)
+    (tmp_path / 'driver.py').write_text(DRIVER)
+    env = dict(os.environ, REPLAY_MODE='replay', FIXTURES_DIR=str(FIXTURES / 'replay'),
+               PYTHONPATH=str(tmp_path))
+    result = subprocess.run([sys.executable, 'driver.py'], cwd=tmp_path, env=env,
+                            capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr[-2000:]
+    summary = json.loads(result.stdout.strip().splitlines()[-1])
+    assert summary['new_codes'] == summary['stored'] > 0
+
+    conn = sqlite3.connect(tmp_path / 'farcaster_codes.db')
+    try:
+        # Progress reaches the database only through the writer's add_codes
+        assert conn.execute('SELECT COUNT(*) FROM reddit_submissions').fetchone()[0] > 0
+        assert conn.execute('SELECT COUNT(*) FROM twitter_cursors').fetchone()[0] == 1
+    finally:
+        conn.close()
+    jobs = sqlite3.connect(tmp_path / 'farcaster_jobs.db')
+    try:
+        assert jobs.execute("SELECT COUNT(*) FROM jobs WHERE status != 'done'").fetchone()[0] == 0
+    finally:
+        jobs.close()